@@ -0,0 +1,40 @@
+"""Add per-user row counters
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18 10:00:00.000000
+App Version: 0.9.3
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('user_counters',
+    sa.Column('user_id', UUID(as_uuid=True), nullable=False),
+    sa.Column('observation_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('location_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='fk_user_counters_user_id', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill from existing rows
+    op.execute("""
+        INSERT INTO user_counters (user_id, observation_count, location_count)
+        SELECT u.id,
+               (SELECT COUNT(*) FROM observations o WHERE o.user_id = u.id),
+               (SELECT COUNT(*) FROM locations l WHERE l.user_id = u.id)
+        FROM users u
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('user_counters')
@@ -0,0 +1,44 @@
+"""Add composite indexes for per-user sorted listings
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18 11:00:00.000000
+App Version: 0.9.3
+
+"""
+from alembic import op
+
+
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+OBSERVATION_SORT_COLUMNS = ['species', 'category', 'date', 'created_at', 'updated_at']
+LOCATION_SORT_COLUMNS = ['name', 'address', 'created_at', 'updated_at']
+
+
+def upgrade() -> None:
+    # (user_id, <sort column>, id) matches the ownership filter plus keyset ordering
+    op.create_index('ix_observations_user_id_id', 'observations', ['user_id', 'id'], unique=False)
+    for column in OBSERVATION_SORT_COLUMNS:
+        op.create_index(f'ix_observations_user_id_{column}_id', 'observations', ['user_id', column, 'id'], unique=False)
+
+    op.create_index('ix_locations_user_id_id', 'locations', ['user_id', 'id'], unique=False)
+    for column in LOCATION_SORT_COLUMNS:
+        op.create_index(f'ix_locations_user_id_{column}_id', 'locations', ['user_id', column, 'id'], unique=False)
+
+    op.create_index('ix_observations_location_id', 'observations', ['location_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_observations_location_id', table_name='observations')
+
+    for column in reversed(LOCATION_SORT_COLUMNS):
+        op.drop_index(f'ix_locations_user_id_{column}_id', table_name='locations')
+    op.drop_index('ix_locations_user_id_id', table_name='locations')
+
+    for column in reversed(OBSERVATION_SORT_COLUMNS):
+        op.drop_index(f'ix_observations_user_id_{column}_id', table_name='observations')
+    op.drop_index('ix_observations_user_id_id', table_name='observations')
@@ -0,0 +1,83 @@
+"""Add geohash column to locations for bounding-box queries
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18 12:00:00.000000
+App Version: 0.9.3
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Copy of app.geo.encode_geohash as of this revision, so the backfill does not change with app code
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 12
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def upgrade() -> None:
+    op.add_column('locations', sa.Column('geohash', sa.String(12, collation='C'), nullable=True))
+
+    # Backfill in batches
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(sa.text(
+            "SELECT id, latitude, longitude FROM locations "
+            "WHERE id > :last_id AND latitude IS NOT NULL AND longitude IS NOT NULL "
+            "ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": BATCH_SIZE}).all()
+        if not rows:
+            break
+        connection.execute(
+            sa.text("UPDATE locations SET geohash = :geohash WHERE id = :id"),
+            [{"id": row.id, "geohash": encode_geohash(row.latitude, row.longitude)} for row in rows]
+        )
+        last_id = rows[-1].id
+
+    op.create_index('ix_locations_user_id_geohash', 'locations', ['user_id', 'geohash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_locations_user_id_geohash', table_name='locations')
+    op.drop_column('locations', 'geohash')
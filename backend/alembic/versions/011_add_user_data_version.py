@@ -0,0 +1,24 @@
+"""Add per-user data version
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18 16:00:00.000000
+App Version: 0.9.3
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('user_counters', sa.Column('data_version', sa.BigInteger(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('user_counters', 'data_version')
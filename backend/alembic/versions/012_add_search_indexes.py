@@ -0,0 +1,53 @@
+"""Add full-text and trigram search indexes
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18 17:00:00.000000
+App Version: 0.9.3
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+OBSERVATION_SEARCH_VECTOR = (
+    "setweight(to_tsvector('norwegian', coalesce(species, '')), 'A') || "
+    "setweight(to_tsvector('norwegian', coalesce(notes, '')), 'B')"
+)
+LOCATION_SEARCH_VECTOR = (
+    "setweight(to_tsvector('norwegian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('norwegian', coalesce(address, '')), 'B') || "
+    "setweight(to_tsvector('norwegian', coalesce(description, '')), 'C')"
+)
+TRIGRAM_COLUMNS = [('observations', 'species'), ('locations', 'name'), ('locations', 'address')]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Stored generated columns are filled for existing rows by the table rewrite
+    op.add_column('observations', sa.Column('search_vector', TSVECTOR(), sa.Computed(OBSERVATION_SEARCH_VECTOR, persisted=True), nullable=True))
+    op.add_column('locations', sa.Column('search_vector', TSVECTOR(), sa.Computed(LOCATION_SEARCH_VECTOR, persisted=True), nullable=True))
+    op.create_index('ix_observations_search_vector', 'observations', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_locations_search_vector', 'locations', ['search_vector'], unique=False, postgresql_using='gin')
+
+    for table, column in TRIGRAM_COLUMNS:
+        op.create_index(f'ix_{table}_{column}_trgm', table, [column], unique=False, postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    for table, column in reversed(TRIGRAM_COLUMNS):
+        op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
+
+    op.drop_index('ix_locations_search_vector', table_name='locations')
+    op.drop_index('ix_observations_search_vector', table_name='observations')
+    op.drop_column('locations', 'search_vector')
+    op.drop_column('observations', 'search_vector')
+    # pg_trgm is left installed; other objects may depend on it
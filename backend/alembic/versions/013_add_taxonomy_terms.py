@@ -0,0 +1,104 @@
+"""Normalize observation species and category into a dictionary table
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18 18:00:00.000000
+App Version: 0.9.3
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10000
+
+OBSERVATION_SEARCH_VECTOR = "to_tsvector('norwegian', coalesce(notes, ''))"
+OLD_OBSERVATION_SEARCH_VECTOR = (
+    "setweight(to_tsvector('norwegian', coalesce(species, '')), 'A') || "
+    "setweight(to_tsvector('norwegian', coalesce(notes, '')), 'B')"
+)
+
+
+def _backfill(statement: str) -> None:
+    # Walk the id range so each UPDATE touches at most BATCH_SIZE rows. Each batch
+    # commits on its own, so row locks are released as the backfill goes.
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        max_id = connection.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM observations")).scalar()
+        for start in range(0, max_id + 1, BATCH_SIZE):
+            connection.execute(sa.text(statement), {"start": start, "end": start + BATCH_SIZE})
+
+
+def upgrade() -> None:
+    op.create_table('taxonomy_terms',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('kind', 'name', name='uq_taxonomy_terms_kind_name')
+    )
+    op.create_index('ix_taxonomy_terms_name_trgm', 'taxonomy_terms', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+    op.execute("""
+        INSERT INTO taxonomy_terms (kind, name)
+        SELECT DISTINCT 'species', species FROM observations
+        UNION ALL
+        SELECT DISTINCT 'category', category FROM observations
+    """)
+
+    op.add_column('observations', sa.Column('species_id', sa.Integer(), nullable=True))
+    op.add_column('observations', sa.Column('category_id', sa.Integer(), nullable=True))
+    _backfill("""
+        UPDATE observations o SET species_id = sp.id, category_id = ca.id
+        FROM taxonomy_terms sp, taxonomy_terms ca
+        WHERE o.id >= :start AND o.id < :end
+          AND sp.kind = 'species' AND sp.name = o.species
+          AND ca.kind = 'category' AND ca.name = o.category
+    """)
+    op.alter_column('observations', 'species_id', nullable=False)
+    op.alter_column('observations', 'category_id', nullable=False)
+    op.create_foreign_key('fk_observations_species_id', 'observations', 'taxonomy_terms', ['species_id'], ['id'])
+    op.create_foreign_key('fk_observations_category_id', 'observations', 'taxonomy_terms', ['category_id'], ['id'])
+    op.create_index('ix_observations_user_id_species_id_id', 'observations', ['user_id', 'species_id', 'id'], unique=False)
+    op.create_index('ix_observations_user_id_category_id_id', 'observations', ['user_id', 'category_id', 'id'], unique=False)
+
+    # The generated search column depends on species, so rebuild it over notes only
+    op.drop_column('observations', 'search_vector')
+    op.drop_column('observations', 'species')
+    op.drop_column('observations', 'category')
+    op.add_column('observations', sa.Column('search_vector', TSVECTOR(), sa.Computed(OBSERVATION_SEARCH_VECTOR, persisted=True), nullable=True))
+    op.create_index('ix_observations_search_vector', 'observations', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_column('observations', 'search_vector')
+    op.add_column('observations', sa.Column('species', sa.String(), nullable=True))
+    op.add_column('observations', sa.Column('category', sa.String(), nullable=True))
+    _backfill("""
+        UPDATE observations o SET species = sp.name, category = ca.name
+        FROM taxonomy_terms sp, taxonomy_terms ca
+        WHERE o.id >= :start AND o.id < :end
+          AND sp.id = o.species_id AND ca.id = o.category_id
+    """)
+    op.alter_column('observations', 'species', nullable=False)
+    op.alter_column('observations', 'category', nullable=False)
+    op.create_index('ix_observations_user_id_species_id', 'observations', ['user_id', 'species', 'id'], unique=False)
+    op.create_index('ix_observations_user_id_category_id', 'observations', ['user_id', 'category', 'id'], unique=False)
+    op.create_index('ix_observations_species_trgm', 'observations', ['species'], unique=False, postgresql_using='gin', postgresql_ops={'species': 'gin_trgm_ops'})
+    op.add_column('observations', sa.Column('search_vector', TSVECTOR(), sa.Computed(OLD_OBSERVATION_SEARCH_VECTOR, persisted=True), nullable=True))
+    op.create_index('ix_observations_search_vector', 'observations', ['search_vector'], unique=False, postgresql_using='gin')
+
+    op.drop_index('ix_observations_user_id_category_id_id', table_name='observations')
+    op.drop_index('ix_observations_user_id_species_id_id', table_name='observations')
+    op.drop_constraint('fk_observations_category_id', 'observations', type_='foreignkey')
+    op.drop_constraint('fk_observations_species_id', 'observations', type_='foreignkey')
+    op.drop_column('observations', 'category_id')
+    op.drop_column('observations', 'species_id')
+    op.drop_index('ix_taxonomy_terms_name_trgm', table_name='taxonomy_terms')
+    op.drop_table('taxonomy_terms')
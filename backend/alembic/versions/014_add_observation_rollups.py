@@ -0,0 +1,46 @@
+"""Add per-user observation statistics rollups
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-18 19:00:00.000000
+App Version: 0.9.3
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+# Snapshot of the stats_timezone setting default when this revision was written
+STATS_TIMEZONE = 'Europe/Oslo'
+
+
+def upgrade() -> None:
+    op.create_table('observation_rollups',
+    sa.Column('user_id', UUID(as_uuid=True), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('species_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='fk_observation_rollups_user_id', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['species_id'], ['taxonomy_terms.id'], name='fk_observation_rollups_species_id'),
+    sa.ForeignKeyConstraint(['category_id'], ['taxonomy_terms.id'], name='fk_observation_rollups_category_id'),
+    sa.PrimaryKeyConstraint('user_id', 'day', 'species_id', 'category_id')
+    )
+
+    # Backfill from existing rows
+    op.get_bind().execute(sa.text("""
+        INSERT INTO observation_rollups (user_id, day, species_id, category_id, count)
+        SELECT user_id, (date AT TIME ZONE :timezone)::date AS day, species_id, category_id, COUNT(*)
+        FROM observations
+        GROUP BY user_id, day, species_id, category_id
+    """), {"timezone": STATS_TIMEZONE})
+
+
+def downgrade() -> None:
+    op.drop_table('observation_rollups')
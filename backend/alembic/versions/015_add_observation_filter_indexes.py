@@ -0,0 +1,25 @@
+"""Add indexes for observation list filters
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-18 20:00:00.000000
+App Version: 0.9.3
+
+"""
+from alembic import op
+
+
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_observations_user_id_location_id_id', 'observations', ['user_id', 'location_id', 'id'])
+    op.create_index('ix_observations_date_brin', 'observations', ['date'], postgresql_using='brin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_observations_date_brin', table_name='observations')
+    op.drop_index('ix_observations_user_id_location_id_id', table_name='observations')
@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+import hashlib
+import time
 from uuid import UUID, uuid4
 from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import httpx
 
+from .cache import TTLCache
 from .config import settings
 from .database import get_db
 from .models import User as UserModel
@@ -19,6 +23,12 @@ def get_security():
 
 security = get_security()
 
+# Detached User rows keyed by user id; auth_callback invalidates on profile changes
+user_cache = TTLCache("users", maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl_seconds)
+
+# Already-verified tokens keyed by SHA-256 of the token; entries never outlive the token's exp
+token_cache = TTLCache("tokens", maxsize=settings.token_cache_size, ttl=settings.token_cache_ttl_seconds)
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     now = datetime.now(timezone.utc)
@@ -45,19 +55,40 @@ def decode_access_token(token: str) -> Optional[TokenData]:
             options={"verify_iss": True},
             issuer=settings.jwt_issuer
         )
-        logger.info(f"JWT payload decoded: {payload}")
+        logger.debug(f"JWT payload decoded: {payload}")
         user_id_str: str = payload.get("sub")
         email: str = payload.get("email")
-        logger.info(f"Extracted from payload - user_id_str: {user_id_str}, email: {email}")
+        logger.debug(f"Extracted from payload - user_id_str: {user_id_str}, email: {email}")
         if user_id_str is None or email is None:
             logger.error(f"Missing user_id or email in token payload. user_id_str: {user_id_str}, email: {email}")
             return None
         user_id = UUID(user_id_str)
-        return TokenData(user_id=user_id, email=email)
+        return TokenData(user_id=user_id, email=email, exp=payload.get("exp"))
     except (JWTError, ValueError) as e:
         logger.error(f"JWT decode error: {type(e).__name__}: {str(e)}")
         return None
 
+def verify_access_token(token: str) -> Optional[TokenData]:
+    key = hashlib.sha256(token.encode()).digest()
+    token_data = token_cache.get(key)
+    if token_data is not None:
+        if token_data.exp is None or token_data.exp > time.time():
+            return token_data
+        token_cache.invalidate(key)
+
+    token_data = decode_access_token(token)
+    if token_data is not None and token_data.exp is not None:
+        ttl = min(settings.token_cache_ttl_seconds, token_data.exp - time.time())
+        if ttl > 0:
+            token_cache.set(key, token_data, ttl=ttl)
+    return token_data
+
+def get_request_token_data(request: Request, token: str) -> Optional[TokenData]:
+    # LoggingMiddleware stores the claims it verified for this request's bearer token
+    if getattr(request.state, "token", None) == token:
+        return request.state.token_data
+    return verify_access_token(token)
+
 async def exchange_code_for_token(code: str, redirect_uri: str) -> dict:
     import logging
     logger = logging.getLogger(__name__)
@@ -91,8 +122,9 @@ async def get_user_info(access_token: str) -> dict:
         return response.json()
 
 async def get_current_user(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> UserModel:
     import logging
     logger = logging.getLogger(__name__)
@@ -100,7 +132,10 @@ async def get_current_user(
     # Test mode: bypass authentication and return/create a test user
     if settings.disable_auth:
         logger.info("Auth disabled - using test user")
-        test_user = db.query(UserModel).filter(UserModel.email == "test@example.com").first()
+        test_user = user_cache.get("test@example.com")
+        if test_user is not None:
+            return test_user
+        test_user = await db.scalar(select(UserModel).where(UserModel.email == "test@example.com"))
         if not test_user:
             test_user = UserModel(
                 keycloak_id="test-user-id",
@@ -108,14 +143,16 @@ async def get_current_user(
                 name="Test User"
             )
             db.add(test_user)
-            db.commit()
-            db.refresh(test_user)
+            await db.commit()
+            await db.refresh(test_user)
+        db.expunge(test_user)
+        user_cache.set("test@example.com", test_user)
         return test_user
 
     token = credentials.credentials
     logger.info(f"Validating token: {token[:20]}...")
 
-    token_data = decode_access_token(token)
+    token_data = get_request_token_data(request, token)
 
     if token_data is None:
         logger.error("Token decode failed - token_data is None")
@@ -127,25 +164,30 @@ async def get_current_user(
 
     logger.info(f"Token decoded successfully - user_id: {token_data.user_id}, email: {token_data.email}")
 
-    user = db.query(UserModel).filter(UserModel.id == token_data.user_id).first()
+    user = user_cache.get(token_data.user_id)
     if user is None:
-        logger.error(f"User not found in database - user_id: {token_data.user_id}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        user = await db.get(UserModel, token_data.user_id)
+        if user is None:
+            logger.error(f"User not found in database - user_id: {token_data.user_id}")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        db.expunge(user)
+        user_cache.set(user.id, user)
 
     logger.info(f"User authenticated successfully - id: {user.id}, email: {user.email}")
     return user
 
 async def get_current_user_optional(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Optional[UserModel]:
     if credentials is None:
         return None
     try:
-        return await get_current_user(credentials, db)
+        return await get_current_user(request, credentials, db)
     except HTTPException:
         return None
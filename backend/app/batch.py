@@ -0,0 +1,20 @@
+from typing import Any, Dict, List, Tuple, Type, TypeVar
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from .config import settings
+
+M = TypeVar('M', bound=BaseModel)
+
+
+def validate_batch(schema: Type[M], items: List[Dict[str, Any]]) -> Tuple[List[Tuple[int, M]], List[dict]]:
+    if len(items) > settings.batch_max_items:
+        raise HTTPException(status_code=422, detail=f"Batch exceeds {settings.batch_max_items} items")
+
+    valid = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            errors.append({"index": index, "detail": e.errors(include_url=False, include_context=False)})
+    return valid, errors
@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+caches: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries also expire after a TTL.
+
+    With maxbytes set, values must support len() and the cache also evicts
+    least recently used entries until their total length fits.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, maxbytes: Optional[int] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._data: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        caches[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            self.invalidate(key)
+        self.misses += 1
+        return default
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        # Like get, but leaves hit/miss stats and LRU order untouched
+        entry = self._data.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.monotonic():
+                return value
+            self.invalidate(key)
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        size = 0 if self.maxbytes is None else len(value)
+        if self.maxbytes is not None and size > self.maxbytes:
+            self.invalidate(key)
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self.invalidate(key)
+        self._data[key] = (value, expires_at)
+        if size:
+            self._sizes[key] = size
+            self.bytes += size
+        while len(self._data) > self.maxsize or (self.maxbytes is not None and self.bytes > self.maxbytes):
+            evicted, _ = self._data.popitem(last=False)
+            self.bytes -= self._sizes.pop(evicted, 0)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+        self.bytes -= self._sizes.pop(key, 0)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._sizes.clear()
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        stats = {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+        if self.maxbytes is not None:
+            stats.update(bytes=self.bytes, maxbytes=self.maxbytes)
+        return stats
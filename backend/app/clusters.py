@@ -0,0 +1,125 @@
+"""Server-side clustering of a user's locations for the map.
+
+Locations are grouped into a GRID_SIZE x GRID_SIZE grid inside each Web
+Mercator tile at the requested zoom. Each tile is cached on its own under the
+user's data version, so panning only queries the tiles that newly came into
+view and any write makes the old entries unreachable.
+"""
+import math
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import case, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import TTLCache
+from .config import settings
+from .counters import get_data_version
+from .geo import BBox, bbox_filter, tile_bbox, tiles_for_bbox
+from .models import Location as LocationModel, Observation as ObservationModel
+
+GRID_SIZE = 4
+MAX_CLUSTER_TILES = 64
+
+cluster_cache = TTLCache("clusters", settings.cluster_cache_size, settings.cluster_cache_ttl_seconds)
+
+
+def _cell_columns(zoom: int):
+    scale = (1 << zoom) * GRID_SIZE
+    mercator = func.ln(func.tan(math.pi / 4 + func.radians(LocationModel.latitude) / 2))
+    cell_x = func.least(func.floor((LocationModel.longitude + 180) / 360 * scale), scale - 1)
+    cell_y = func.least(func.floor((1 - mercator / math.pi) / 2 * scale), scale - 1)
+    return cell_x.label("cell_x"), cell_y.label("cell_y")
+
+
+def _observation_counts(user_id: UUID):
+    # Counted per location in view, through the location_id index
+    return (
+        select(func.count().label("observation_count"))
+        .where(ObservationModel.location_id == LocationModel.id, ObservationModel.user_id == user_id)
+        .lateral()
+    )
+
+
+async def _query_tiles(db: AsyncSession, user_id: UUID, zoom: int, tiles: List[Tuple[int, int]]) -> Dict[Tuple[int, int], List[dict]]:
+    xs = [x for x, _ in tiles]
+    ys = [y for _, y in tiles]
+    north_west = tile_bbox(zoom, min(xs), min(ys))
+    south_east = tile_bbox(zoom, max(xs), max(ys))
+    envelope = BBox(north_west.min_lon, south_east.min_lat, south_east.max_lon, north_west.max_lat)
+
+    counts = _observation_counts(user_id)
+    cell_x, cell_y = _cell_columns(zoom)
+    location_count = func.count(LocationModel.id)
+    stmt = (
+        select(
+            cell_x,
+            cell_y,
+            location_count.label("count"),
+            func.avg(LocationModel.latitude).label("latitude"),
+            func.avg(LocationModel.longitude).label("longitude"),
+            func.sum(counts.c.observation_count).label("observation_count"),
+            case((location_count < settings.cluster_min_points, func.array_agg(LocationModel.id))).label("location_ids"),
+        )
+        .join(counts, true())
+        .where(
+            LocationModel.user_id == user_id,
+            bbox_filter(LocationModel.geohash, LocationModel.latitude, LocationModel.longitude, envelope),
+        )
+        .group_by(cell_x, cell_y)
+    )
+    cells = (await db.execute(stmt)).all()
+
+    points = {}
+    point_ids = [location_id for cell in cells if cell.location_ids for location_id in cell.location_ids]
+    if point_ids:
+        point_stmt = (
+            select(LocationModel.id, LocationModel.name, LocationModel.latitude, LocationModel.longitude, counts.c.observation_count)
+            .join(counts, true())
+            .where(LocationModel.id.in_(point_ids))
+        )
+        points = {row.id: row for row in await db.execute(point_stmt)}
+
+    results: Dict[Tuple[int, int], List[dict]] = {tile: [] for tile in tiles}
+    for cell in cells:
+        tile = (int(cell.cell_x) // GRID_SIZE, int(cell.cell_y) // GRID_SIZE)
+        if tile not in results:
+            continue
+        if cell.location_ids:
+            for location_id in cell.location_ids:
+                point = points[location_id]
+                results[tile].append({
+                    "type": "point",
+                    "location_id": point.id,
+                    "name": point.name,
+                    "latitude": point.latitude,
+                    "longitude": point.longitude,
+                    "count": 1,
+                    "observation_count": point.observation_count,
+                })
+        else:
+            results[tile].append({
+                "type": "cluster",
+                "latitude": float(cell.latitude),
+                "longitude": float(cell.longitude),
+                "count": cell.count,
+                "observation_count": int(cell.observation_count),
+            })
+    return results
+
+
+async def get_clusters(db: AsyncSession, user_id: UUID, bbox: BBox, zoom: int) -> List[dict]:
+    tiles = tiles_for_bbox(bbox, zoom)
+    if len(tiles) > MAX_CLUSTER_TILES:
+        raise HTTPException(status_code=400, detail="bbox covers too many tiles at this zoom")
+
+    version = await get_data_version(db, user_id)
+    cached = {tile: cluster_cache.get((user_id, version, zoom, *tile)) for tile in tiles}
+    missing = [tile for tile, items in cached.items() if items is None]
+    if missing:
+        for tile, items in (await _query_tiles(db, user_id, zoom, missing)).items():
+            cluster_cache.set((user_id, version, zoom, *tile), items)
+            cached[tile] = items
+
+    return [item for tile in tiles for item in cached[tile]]
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,6 +9,14 @@ class Settings(BaseSettings):
     postgres_host: str = "postgres"
     postgres_port: int = 5432
 
+    # Connection pool; size against the number of uvicorn workers
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    db_pgbouncer: bool = False
+
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_days: int = 7
@@ -21,6 +30,58 @@ class Settings(BaseSettings):
 
     frontend_url: str = "http://localhost:5173"
 
+    # In-process cache of authenticated users
+    user_cache_size: int = 1024
+    user_cache_ttl_seconds: int = 60
+
+    # In-process cache of verified JWTs
+    token_cache_size: int = 4096
+    token_cache_ttl_seconds: int = 300
+
+    # Prometheus-compatible /metrics endpoint, plus /health/caches and /health/db-pool
+    metrics_enabled: bool = False
+
+    # Maximum number of items accepted by the batch create endpoints
+    batch_max_items: int = 1000
+
+    # Maximum number of row errors reported by bulk imports
+    import_max_errors: int = 100
+
+    # Server-side map clustering; cells with fewer locations are returned as points
+    cluster_min_points: int = 2
+    cluster_cache_size: int = 4096
+    cluster_cache_ttl_seconds: int = 300
+
+    # Encoded vector tiles, keyed on the user's data version
+    tile_cache_size: int = 2048
+    tile_cache_ttl_seconds: int = 600
+
+    # Serialized JSON of list/detail responses, keyed on the user's data version
+    response_cache_size: int = 8192
+    response_cache_ttl_seconds: int = 300
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # Species/category dictionary lookup; terms are immutable, so the TTL only bounds memory
+    taxonomy_cache_size: int = 65536
+    taxonomy_cache_ttl_seconds: int = 86400
+
+    # Statistics rollups bucket observations by calendar day in this zone.
+    # Changing it requires rebuilding observation_rollups.
+    stats_timezone: str = "Europe/Oslo"
+
+    # Per-user species autocomplete; the reference list is a text file with one species per line
+    species_index_cache_size: int = 1024
+    species_index_ttl_seconds: int = 3600
+    species_reference_file: Optional[str] = None
+
+    # Per-request SQL profiling and slow-query log
+    sql_profiling_enabled: bool = False
+    slow_query_threshold_ms: float = 200
+    sql_repeat_warning_threshold: int = 10
+
+    # Adds debug response headers such as X-Query-Count
+    debug: bool = False
+
     # Test mode - disables authentication
     disable_auth: bool = False
 
@@ -28,6 +89,10 @@ class Settings(BaseSettings):
     def database_url(self) -> str:
         return f"postgresql://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
 
+    @property
+    def async_database_url(self) -> str:
+        return f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
+
     @property
     def keycloak_token_url(self) -> str:
         return f"{self.keycloak_server_url}/realms/{self.keycloak_realm}/protocol/openid-connect/token"
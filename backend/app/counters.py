@@ -0,0 +1,71 @@
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import func, select, update, Select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import UserCounter, Observation as ObservationModel, Location as LocationModel
+
+
+class CountMode(str, Enum):
+    exact = "exact"
+    estimated = "estimated"
+    none = "none"
+
+
+async def adjust_counts(db: AsyncSession, user_id: UUID, observations: int = 0, locations: int = 0) -> None:
+    # Writes that change the totals come through here, so it also bumps the data version
+    result = await db.execute(
+        update(UserCounter)
+        .where(UserCounter.user_id == user_id)
+        .values(
+            observation_count=UserCounter.observation_count + observations,
+            location_count=UserCounter.location_count + locations,
+            data_version=UserCounter.data_version + 1,
+        )
+    )
+    if result.rowcount:
+        return
+
+    # First write for this user: seed from COUNT(*). Call after flush so the seed includes the pending change.
+    stmt = insert(UserCounter).values(
+        user_id=user_id,
+        observation_count=select(func.count(ObservationModel.id)).where(ObservationModel.user_id == user_id).scalar_subquery(),
+        location_count=select(func.count(LocationModel.id)).where(LocationModel.user_id == user_id).scalar_subquery(),
+        data_version=1,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserCounter.user_id],
+        set_={
+            "observation_count": UserCounter.observation_count + observations,
+            "location_count": UserCounter.location_count + locations,
+            "data_version": UserCounter.data_version + 1,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def bump_data_version(db: AsyncSession, user_id: UUID) -> None:
+    # For writes that change data but no totals, e.g. edits in place
+    result = await db.execute(
+        update(UserCounter)
+        .where(UserCounter.user_id == user_id)
+        .values(data_version=UserCounter.data_version + 1)
+    )
+    if not result.rowcount:
+        await adjust_counts(db, user_id)
+
+
+async def get_data_version(db: AsyncSession, user_id: UUID) -> int:
+    return await db.scalar(select(UserCounter.data_version).where(UserCounter.user_id == user_id)) or 0
+
+
+async def count_total(db: AsyncSession, user_id: UUID, mode: CountMode, counter_field: str, exact_stmt: Select, filtered: bool = False) -> Optional[int]:
+    if mode == CountMode.none:
+        return None
+    # Counters only know the unfiltered per-user totals
+    if mode == CountMode.estimated and not filtered:
+        counter = await db.get(UserCounter, user_id)
+        if counter is not None:
+            return getattr(counter, counter_field)
+    return await db.scalar(exact_stmt)
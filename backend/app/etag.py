@@ -0,0 +1,37 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .auth import get_current_user
+from .counters import get_data_version
+from .database import get_db
+from .models import User as UserModel
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag, using the weak comparison RFC 9110 asks for."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def data_etag(user_id: UUID, version: int) -> str:
+    # Caches key ETags by URL, so the user's data version alone identifies the representation
+    return f'"{user_id.hex}-{version}"'
+
+
+async def conditional_get(request: Request, response: Response, db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)) -> int:
+    """Answers If-None-Match with 304 before the route runs; returns the user's data version."""
+    version = await get_data_version(db, current_user.id)
+    etag = data_etag(current_user.id, version)
+    # Private: responses are per user. no-cache: revalidate with the ETag on every use
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return version
@@ -0,0 +1,135 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator
+from uuid import UUID
+
+from sqlalchemy import select
+
+from .database import SessionLocal
+from .models import Observation as ObservationModel, Location as LocationModel
+from .taxonomy import term_names
+
+EXPORT_BATCH_SIZE = 1000
+
+CSV_COLUMNS = [
+    "id", "species", "category", "date", "notes", "location_id",
+    "location_name", "latitude", "longitude", "created_at", "updated_at",
+]
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+    geojson = "geojson"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+    ExportFormat.geojson: "application/geo+json",
+}
+
+
+def _export_query(user_id: UUID):
+    return (
+        select(
+            ObservationModel.id,
+            ObservationModel.species_id,
+            ObservationModel.category_id,
+            ObservationModel.date,
+            ObservationModel.notes,
+            ObservationModel.location_id,
+            LocationModel.name.label("location_name"),
+            LocationModel.latitude,
+            LocationModel.longitude,
+            ObservationModel.created_at,
+            ObservationModel.updated_at,
+        )
+        .outerjoin(LocationModel, LocationModel.id == ObservationModel.location_id)
+        .where(ObservationModel.user_id == user_id)
+        .order_by(ObservationModel.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _values(row, names: dict) -> dict:
+    values = row._asdict()
+    values["species"] = names[values.pop("species_id")]
+    values["category"] = names[values.pop("category_id")]
+    return values
+
+
+def _record(values: dict) -> dict:
+    return {
+        "id": values["id"],
+        "species": values["species"],
+        "category": values["category"],
+        "date": values["date"],
+        "notes": values["notes"],
+        "location": None if values["location_id"] is None else {
+            "id": values["location_id"],
+            "name": values["location_name"],
+            "latitude": values["latitude"],
+            "longitude": values["longitude"],
+        },
+        "created_at": values["created_at"],
+        "updated_at": values["updated_at"],
+    }
+
+
+def _feature(values: dict) -> dict:
+    geometry = None
+    if values["latitude"] is not None and values["longitude"] is not None:
+        geometry = {"type": "Point", "coordinates": [values["longitude"], values["latitude"]]}
+    properties = _record(values)
+    properties.pop("id")
+    return {"type": "Feature", "id": values["id"], "geometry": geometry, "properties": properties}
+
+
+def _csv_lines(lines) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(lines)
+    return buffer.getvalue()
+
+
+def _csv_values(values: dict) -> list:
+    return [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in (values[column] for column in CSV_COLUMNS)
+    ]
+
+
+async def stream_observations(user_id: UUID, fmt: ExportFormat) -> AsyncIterator[str]:
+    # Own session: the request-scoped one may be closed before the body finishes streaming
+    async with SessionLocal() as db:
+        result = await db.stream(_export_query(user_id))
+
+        if fmt == ExportFormat.csv:
+            yield _csv_lines([CSV_COLUMNS])
+        elif fmt == ExportFormat.geojson:
+            yield '{"type":"FeatureCollection","features":['
+
+        first = True
+        async for rows in result.partitions():
+            names = await term_names(db, (term_id for row in rows for term_id in (row.species_id, row.category_id)))
+            rows = [_values(row, names) for row in rows]
+            if fmt == ExportFormat.csv:
+                yield _csv_lines(_csv_values(row) for row in rows)
+            elif fmt == ExportFormat.ndjson:
+                yield "".join(json.dumps(_record(row), default=_json_default, ensure_ascii=False) + "\n" for row in rows)
+            else:
+                features = ",".join(json.dumps(_feature(row), default=_json_default, ensure_ascii=False) for row in rows)
+                yield features if first else "," + features
+            first = False
+
+        if fmt == ExportFormat.geojson:
+            yield "]}"
@@ -0,0 +1,186 @@
+import math
+from typing import List, NamedTuple, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_
+
+# Geohash base32 alphabet; its characters are in ascending byte order, so every
+# prefix covers one contiguous range of a "C"-collated B-tree index.
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 12
+MAX_COVER_CELLS = 16
+EARTH_RADIUS_M = 6371008.8
+
+
+class BBox(NamedTuple):
+    min_lon: float
+    min_lat: float
+    max_lon: float
+    max_lat: float
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def location_geohash(latitude: Optional[float], longitude: Optional[float]) -> Optional[str]:
+    if latitude is None or longitude is None:
+        return None
+    return encode_geohash(latitude, longitude)
+
+
+def cell_size(precision: int):
+    """Width (longitude degrees) and height (latitude degrees) of a geohash cell."""
+    lon_bits = math.ceil(5 * precision / 2)
+    lat_bits = math.floor(5 * precision / 2)
+    return 360.0 / (1 << lon_bits), 180.0 / (1 << lat_bits)
+
+
+def _cell_indices(low: float, high: float, origin: float, size: float, limit: int) -> range:
+    first = math.floor((low - origin) / size)
+    last = min(math.floor((high - origin) / size), limit - 1)
+    return range(first, last + 1)
+
+
+def cover_bbox(bbox: BBox, max_cells: int = MAX_COVER_CELLS) -> List[str]:
+    """Geohash prefixes whose cells together cover the bounding box.
+
+    Returns an empty list when even single-character cells would exceed
+    max_cells; such a box is too large for the index to help.
+    """
+    precision = 0
+    for candidate in range(1, GEOHASH_PRECISION + 1):
+        width, height = cell_size(candidate)
+        columns = math.floor((bbox.max_lon + 180) / width) - math.floor((bbox.min_lon + 180) / width) + 1
+        rows = math.floor((bbox.max_lat + 90) / height) - math.floor((bbox.min_lat + 90) / height) + 1
+        if columns * rows > max_cells:
+            break
+        precision = candidate
+    if precision == 0:
+        return []
+
+    width, height = cell_size(precision)
+    prefixes = []
+    for row in _cell_indices(bbox.min_lat, bbox.max_lat, -90, height, round(180 / height)):
+        for column in _cell_indices(bbox.min_lon, bbox.max_lon, -180, width, round(360 / width)):
+            center_lat = -90 + (row + 0.5) * height
+            center_lon = -180 + (column + 0.5) * width
+            prefixes.append(encode_geohash(center_lat, center_lon, precision))
+    return prefixes
+
+
+def prefix_range(column, prefix: str):
+    # "~" sorts after every base32 character
+    return and_(column >= prefix, column < prefix + "~")
+
+
+def bbox_filter(geohash_column, latitude_column, longitude_column, bbox: BBox):
+    # The geohash ranges narrow the index scan; the exact check trims cell overhang
+    exact = and_(
+        latitude_column.between(bbox.min_lat, bbox.max_lat),
+        longitude_column.between(bbox.min_lon, bbox.max_lon),
+    )
+    prefixes = cover_bbox(bbox)
+    if not prefixes:
+        return exact
+    return and_(or_(*(prefix_range(geohash_column, prefix) for prefix in prefixes)), exact)
+
+
+def radius_bbox(latitude: float, longitude: float, radius_m: float) -> BBox:
+    """Bounding box around a point; clamped at the poles and the antimeridian."""
+    lat_margin = math.degrees(radius_m / EARTH_RADIUS_M)
+    cos_lat = math.cos(math.radians(min(abs(latitude) + lat_margin, 90)))
+    lon_margin = 180 if cos_lat < 1e-9 else min(math.degrees(radius_m / (EARTH_RADIUS_M * cos_lat)), 180)
+    return BBox(
+        max(longitude - lon_margin, -180), max(latitude - lat_margin, -90),
+        min(longitude + lon_margin, 180), min(latitude + lat_margin, 90),
+    )
+
+
+def haversine_distance(latitude_column, longitude_column, latitude: float, longitude: float):
+    """SQL expression for the great-circle distance in metres to a fixed point."""
+    half_dlat = func.radians(latitude_column - latitude) / 2
+    half_dlon = func.radians(longitude_column - longitude) / 2
+    a = func.power(func.sin(half_dlat), 2) + math.cos(math.radians(latitude)) * func.cos(func.radians(latitude_column)) * func.power(func.sin(half_dlon), 2)
+    return 2 * EARTH_RADIUS_M * func.asin(func.sqrt(func.least(a, 1.0)))
+
+
+def parse_bbox(bbox: str) -> BBox:
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be minLon,minLat,maxLon,maxLat")
+    if not (-180 <= min_lon <= max_lon <= 180 and -90 <= min_lat <= max_lat <= 90):
+        raise HTTPException(status_code=400, detail="bbox is out of range or inverted")
+    return BBox(min_lon, min_lat, max_lon, max_lat)
+
+
+# Web Mercator (slippy map) tiles, as used by Leaflet on the frontend
+MAX_MERCATOR_LAT = 85.0511287798
+
+
+def lon_to_tile_x(longitude: float, zoom: int) -> int:
+    n = 1 << zoom
+    return min(max(int((longitude + 180) / 360 * n), 0), n - 1)
+
+
+def lat_to_tile_y(latitude: float, zoom: int) -> int:
+    n = 1 << zoom
+    latitude = max(min(latitude, MAX_MERCATOR_LAT), -MAX_MERCATOR_LAT)
+    mercator = math.log(math.tan(math.pi / 4 + math.radians(latitude) / 2))
+    return min(max(int((1 - mercator / math.pi) / 2 * n), 0), n - 1)
+
+
+def project_to_tile(latitude: float, longitude: float, zoom: int, x: int, y: int, extent: int) -> tuple:
+    """Position of a point in a tile's integer coordinate space (origin top-left)."""
+    n = 1 << zoom
+    latitude = max(min(latitude, MAX_MERCATOR_LAT), -MAX_MERCATOR_LAT)
+    mercator = math.log(math.tan(math.pi / 4 + math.radians(latitude) / 2))
+    world_x = (longitude + 180) / 360 * n
+    world_y = (1 - mercator / math.pi) / 2 * n
+    return round((world_x - x) * extent), round((world_y - y) * extent)
+
+
+def tile_bbox(zoom: int, x: int, y: int) -> BBox:
+    n = 1 << zoom
+
+    def latitude(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return BBox(x / n * 360 - 180, latitude(y + 1), (x + 1) / n * 360 - 180, latitude(y))
+
+
+def tiles_for_bbox(bbox: BBox, zoom: int) -> List[tuple]:
+    """(x, y) of every tile at zoom that intersects the bounding box."""
+    xs = range(lon_to_tile_x(bbox.min_lon, zoom), lon_to_tile_x(bbox.max_lon, zoom) + 1)
+    ys = range(lat_to_tile_y(bbox.max_lat, zoom), lat_to_tile_y(bbox.min_lat, zoom) + 1)
+    return [(x, y) for y in ys for x in xs]
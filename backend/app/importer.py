@@ -0,0 +1,302 @@
+"""Streaming bulk import of observations and locations.
+
+Rows are parsed one at a time from CSV or a GeoJSON FeatureCollection, validated
+against ObservationBase/LocationBase, streamed with COPY FROM STDIN into a
+temporary staging table and merged into the real table in the same transaction.
+
+Can also be run from backend/ for admin migrations:
+
+    python -m app.importer observations export.csv --user-id <uuid>
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import re
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, TextIO, Tuple, Type
+from uuid import UUID
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .counters import adjust_counts
+from .geo import location_geohash
+from .species import invalidate_species
+from .schemas.location import LocationBase
+from .schemas.observation import ObservationBase
+
+logger = logging.getLogger(__name__)
+
+FEATURES_RE = re.compile(r'"features"\s*:\s*\[')
+PROGRESS_EVERY = 10000
+# Parsing and validation are synchronous; hand the event loop back this often
+YIELD_EVERY = 200
+
+
+class ImportKind(str, Enum):
+    observations = "observations"
+    locations = "locations"
+
+
+class ImportFormat(str, Enum):
+    csv = "csv"
+    geojson = "geojson"
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+class ImportReport:
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.received = 0
+        self.imported = 0
+        self.rejected = 0
+        self.errors: List[dict] = []
+
+    def reject(self, index: int, detail: Any) -> None:
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"index": index, "detail": detail})
+
+    def as_dict(self) -> dict:
+        return {
+            "received": self.received,
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "errors_truncated": self.rejected > len(self.errors),
+        }
+
+
+STAGING = {
+    ImportKind.observations: {
+        "schema": ObservationBase,
+        "columns": ["species", "date", "location_id", "notes", "category"],
+        "derived": {},
+        "create": """
+            CREATE TEMP TABLE import_observations (
+                row_index integer, species text, date timestamptz, location_id integer, notes text, category text
+            ) ON COMMIT DROP
+        """,
+        # New species/category names go into the dictionary before the merge joins on it
+        "prepare": [
+            """
+            INSERT INTO taxonomy_terms (kind, name)
+            SELECT DISTINCT 'species', species FROM import_observations
+            ON CONFLICT ON CONSTRAINT uq_taxonomy_terms_kind_name DO NOTHING
+            """,
+            """
+            INSERT INTO taxonomy_terms (kind, name)
+            SELECT DISTINCT 'category', category FROM import_observations
+            ON CONFLICT ON CONSTRAINT uq_taxonomy_terms_kind_name DO NOTHING
+            """,
+        ],
+        # Rows pointing at someone else's (or a missing) location are rejected, not merged
+        "rejected": """
+            SELECT s.row_index FROM import_observations s
+            LEFT JOIN locations l ON l.id = s.location_id AND l.user_id = :user_id
+            WHERE s.location_id IS NOT NULL AND l.id IS NULL
+            ORDER BY s.row_index
+        """,
+        # Merges the rows and their statistics rollups in one statement; returns the row count
+        "merge": """
+            WITH inserted AS (
+                INSERT INTO observations (species_id, date, location_id, user_id, notes, category_id, created_at, updated_at)
+                SELECT sp.id, s.date, s.location_id, :user_id, s.notes, ca.id, now(), now()
+                FROM import_observations s
+                JOIN taxonomy_terms sp ON sp.kind = 'species' AND sp.name = s.species
+                JOIN taxonomy_terms ca ON ca.kind = 'category' AND ca.name = s.category
+                LEFT JOIN locations l ON l.id = s.location_id AND l.user_id = :user_id
+                WHERE s.location_id IS NULL OR l.id IS NOT NULL
+                ORDER BY s.row_index
+                RETURNING date, species_id, category_id
+            ), rolled_up AS (
+                INSERT INTO observation_rollups (user_id, day, species_id, category_id, count)
+                SELECT :user_id, (date AT TIME ZONE :timezone)::date AS day, species_id, category_id, count(*)
+                FROM inserted
+                GROUP BY day, species_id, category_id
+                ORDER BY day, species_id, category_id
+                ON CONFLICT (user_id, day, species_id, category_id)
+                DO UPDATE SET count = observation_rollups.count + EXCLUDED.count
+            )
+            SELECT count(*) FROM inserted
+        """,
+    },
+    ImportKind.locations: {
+        "schema": LocationBase,
+        "columns": ["name", "latitude", "longitude", "description", "address"],
+        "derived": {"geohash": lambda item: location_geohash(item.latitude, item.longitude)},
+        "create": """
+            CREATE TEMP TABLE import_locations (
+                row_index integer, name text, latitude double precision, longitude double precision, description text, address text, geohash text
+            ) ON COMMIT DROP
+        """,
+        "prepare": [],
+        "rejected": None,
+        "merge": """
+            WITH inserted AS (
+                INSERT INTO locations (name, latitude, longitude, description, address, geohash, user_id, created_at, updated_at)
+                SELECT s.name, s.latitude, s.longitude, s.description, s.address, s.geohash, :user_id, now(), now()
+                FROM import_locations s
+                ORDER BY s.row_index
+                RETURNING 1
+            )
+            SELECT count(*) FROM inserted
+        """,
+    },
+}
+
+
+def iter_csv_rows(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    for row in csv.DictReader(stream):
+        yield {key: (value if value != "" else None) for key, value in row.items() if key}
+
+
+def iter_geojson_features(stream: TextIO, chunk_size: int = 65536, max_feature_size: int = 1_048_576) -> Iterator[dict]:
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+
+    def fill() -> None:
+        nonlocal buffer, eof
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer += chunk
+
+    while True:
+        match = FEATURES_RE.search(buffer)
+        if match:
+            buffer = buffer[match.end():]
+            break
+        if eof:
+            raise ImportFormatError("No FeatureCollection features array found")
+        # Keep a tail so a key split across chunks is still found
+        buffer = buffer[-64:]
+        fill()
+
+    pos = 0
+    while True:
+        while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ","):
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                raise ImportFormatError("Unterminated features array")
+            buffer, pos = "", 0
+            fill()
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            feature, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise ImportFormatError("Invalid GeoJSON feature")
+            if len(buffer) - pos > max_feature_size:
+                raise ImportFormatError("GeoJSON feature too large")
+            buffer, pos = buffer[pos:], 0
+            fill()
+            continue
+        yield feature
+        pos = end
+        if pos > chunk_size:
+            buffer, pos = buffer[pos:], 0
+
+
+def feature_to_row(kind: ImportKind, feature: Any) -> Dict[str, Any]:
+    if not isinstance(feature, dict):
+        raise ImportFormatError("GeoJSON feature is not an object")
+    row = dict(feature.get("properties") or {})
+    geometry = feature.get("geometry") or {}
+    if kind == ImportKind.locations and geometry.get("type") == "Point":
+        coordinates = geometry.get("coordinates") or []
+        if len(coordinates) >= 2:
+            row.setdefault("longitude", coordinates[0])
+            row.setdefault("latitude", coordinates[1])
+    return row
+
+
+def iter_rows(kind: ImportKind, fmt: ImportFormat, stream: TextIO) -> Iterator[Dict[str, Any]]:
+    if fmt == ImportFormat.csv:
+        return iter_csv_rows(stream)
+    return (feature_to_row(kind, feature) for feature in iter_geojson_features(stream))
+
+
+async def iter_records(schema: Type[BaseModel], columns: List[str], derived: Dict[str, Callable], rows: Iterator[Dict[str, Any]], report: ImportReport) -> AsyncIterator[Tuple]:
+    # asyncpg drains the records without awaiting in between, so other requests only run at these yields
+    for index, row in enumerate(rows):
+        report.received += 1
+        if report.received % YIELD_EVERY == 0:
+            await asyncio.sleep(0)
+        if report.received % PROGRESS_EVERY == 0:
+            logger.info(f"Import progress: {report.received} rows read, {report.rejected} rejected")
+        try:
+            item = schema.model_validate(row)
+        except ValidationError as e:
+            report.reject(index, e.errors(include_url=False, include_context=False))
+            continue
+        values = [getattr(item, column) for column in columns] + [derive(item) for derive in derived.values()]
+        yield (index, *(value.replace(tzinfo=timezone.utc) if isinstance(value, datetime) and value.tzinfo is None else value for value in values))
+
+
+async def import_rows(db: AsyncSession, user_id: UUID, kind: ImportKind, fmt: ImportFormat, stream: TextIO) -> dict:
+    staging = STAGING[kind]
+    table = f"import_{kind.value}"
+    report = ImportReport(settings.import_max_errors)
+
+    await db.execute(text(staging["create"]))
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    records = iter_records(staging["schema"], staging["columns"], staging["derived"], iter_rows(kind, fmt, stream), report)
+    await raw_connection.driver_connection.copy_records_to_table(
+        table, records=records, columns=["row_index", *staging["columns"], *staging["derived"]]
+    )
+
+    for statement in staging["prepare"]:
+        await db.execute(text(statement))
+    if staging["rejected"]:
+        for (row_index,) in await db.execute(text(staging["rejected"]), {"user_id": user_id}):
+            report.reject(row_index, "Location not found")
+        report.errors.sort(key=lambda error: error["index"])
+
+    result = await db.execute(text(staging["merge"]), {"user_id": user_id, "timezone": settings.stats_timezone})
+    report.imported = result.scalar_one()
+    if kind == ImportKind.observations:
+        await adjust_counts(db, user_id, observations=report.imported)
+    else:
+        await adjust_counts(db, user_id, locations=report.imported)
+    await db.commit()
+    if kind == ImportKind.observations:
+        invalidate_species(user_id)
+
+    logger.info(f"Import finished: {report.imported} {kind.value} imported, {report.rejected} rejected")
+    return report.as_dict()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from .database import SessionLocal
+
+    with open(args.file, encoding="utf-8-sig", newline="") as stream:
+        async with SessionLocal() as db:
+            report = await import_rows(db, args.user_id, args.kind, args.format, stream)
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import observations or locations for one user")
+    parser.add_argument("kind", type=ImportKind, choices=list(ImportKind))
+    parser.add_argument("file")
+    parser.add_argument("--user-id", type=UUID, required=True)
+    parser.add_argument("--format", type=ImportFormat, choices=list(ImportFormat))
+    args = parser.parse_args()
+    if args.format is None:
+        args.format = ImportFormat.geojson if args.file.endswith((".geojson", ".json")) else ImportFormat.csv
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args))
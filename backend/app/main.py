@@ -1,9 +1,20 @@
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .routes.observations import router as observations_router
 from .routes.locations import router as locations_router
 from .routes.auth import router as auth_router
+from .routes.imports import router as imports_router
+from .routes.tiles import router as tiles_router
+from .routes.search import router as search_router
+from .routes.species import router as species_router
+from .routes.stats import router as stats_router
 from .config import settings
+from .cache import caches
+from .database import engine
+from .pool import pool_snapshot
+from .metrics import MetricsMiddleware, instrument_engine, render_metrics
+from .profiling import SqlProfilerMiddleware, profile_engine
 from .middleware import LoggingMiddleware
 from .logging_context import SubFilter
 from pathlib import Path
@@ -30,6 +41,9 @@ for handler in logging.root.handlers:
 
 app = FastAPI(title="Mittnaturkart API", version=VERSION)
 
+if settings.sql_profiling_enabled:
+    profile_engine(engine)
+    app.add_middleware(SqlProfilerMiddleware)
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(
     CORSMiddleware,
@@ -38,11 +52,19 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    app.add_middleware(MetricsMiddleware)
 
 api_v1_router = APIRouter(prefix="/api/v1")
 api_v1_router.include_router(observations_router)
 api_v1_router.include_router(locations_router)
 api_v1_router.include_router(auth_router)
+api_v1_router.include_router(imports_router)
+api_v1_router.include_router(tiles_router)
+api_v1_router.include_router(search_router)
+api_v1_router.include_router(species_router)
+api_v1_router.include_router(stats_router)
 app.include_router(api_v1_router)
 
 @app.get("/")
@@ -52,3 +74,17 @@ def read_root():
 @app.api_route("/health", methods=["GET", "HEAD"])
 def health_check():
     return {"status": "ok"}
+
+if settings.metrics_enabled:
+    # Internal statistics, exposed only where /metrics is
+    @app.get("/health/caches", include_in_schema=False)
+    def cache_stats():
+        return {name: cache.stats() for name, cache in caches.items()}
+
+    @app.get("/health/db-pool", include_in_schema=False)
+    def db_pool_stats():
+        return pool_snapshot(engine.pool)
+
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(render_metrics(engine.pool), media_type="text/plain; version=0.0.4")
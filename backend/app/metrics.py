@@ -0,0 +1,171 @@
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .cache import caches
+from .pool import pool_snapshot
+from .query_timing import observe_queries
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        for labels, value in self.values.items():
+            yield f"{self.name}{_format_labels(labels)} {value}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # Per label set: [per-bucket counts (+Inf last), sum]
+        self.values: Dict[Labels, List] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {total}"
+            yield f"{self.name}_count{_format_labels(labels)} {cumulative}"
+
+
+request_duration = Histogram("http_request_duration_seconds", "HTTP request latency by route template and status class.", LATENCY_BUCKETS)
+requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+query_duration = Histogram("db_query_duration_seconds", "SQL statement execution time.", QUERY_BUCKETS)
+query_errors = Counter("db_query_errors_total", "SQL statements that raised an error.")
+
+
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            requests_in_flight.dec()
+            request_duration.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=_route_template(scope),
+                status=f"{status_code // 100}xx",
+            )
+
+
+def _record_query(statement: str, parameters, elapsed: float) -> None:
+    query_duration.observe(elapsed, operation=statement.lstrip().split(" ", 1)[0].upper())
+
+
+def instrument_engine(engine) -> None:
+    observe_queries(engine, on_query=_record_query, on_error=lambda context: query_errors.inc())
+
+
+def _pool_lines(pool) -> Iterable[str]:
+    snapshot = pool_snapshot(pool)
+    gauges = {
+        "db_pool_size": ("Configured pool size.", snapshot["size"]),
+        "db_pool_checked_out": ("Connections currently checked out.", snapshot["checked_out"]),
+        "db_pool_overflow": ("Overflow connections currently open.", snapshot["overflow"]),
+    }
+    for name, (help, value) in gauges.items():
+        yield f"# HELP {name} {help}"
+        yield f"# TYPE {name} gauge"
+        yield f"{name} {value}"
+    counters = {
+        "db_pool_checkouts_total": ("Connection checkouts.", snapshot["checkouts"]),
+        "db_pool_connects_total": ("Database connections opened.", snapshot["connects"]),
+        "db_pool_timeouts_total": ("Checkouts that timed out waiting for a connection.", snapshot["timeouts"]),
+        "db_pool_wait_seconds_total": ("Time spent waiting for a connection.", snapshot["wait_seconds_total"]),
+        "db_pool_hold_seconds_total": ("Time connections were held before checkin.", snapshot["hold_seconds_total"]),
+    }
+    for name, (help, value) in counters.items():
+        yield f"# HELP {name} {help}"
+        yield f"# TYPE {name} counter"
+        yield f"{name} {value}"
+
+
+def _cache_lines() -> Iterable[str]:
+    for field in ("hits", "misses"):
+        metric = f"cache_{field}_total"
+        yield f"# HELP {metric} In-process cache {field}."
+        yield f"# TYPE {metric} counter"
+        for name, cache in caches.items():
+            yield f"{metric}{_format_labels((('cache', name),))} {cache.stats()[field]}"
+
+
+def render_metrics(pool) -> str:
+    lines: List[str] = []
+    for metric in (request_duration, requests_in_flight, query_duration, query_errors):
+        lines.extend(metric.render())
+    lines.extend(_pool_lines(pool))
+    lines.extend(_cache_lines())
+    return "\n".join(lines) + "\n"
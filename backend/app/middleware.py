@@ -1,30 +1,44 @@
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 from .logging_context import set_sub, clear_sub
-from .auth import decode_access_token
+from .auth import verify_access_token
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        clear_sub()
+class LoggingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        auth_header = request.headers.get("authorization")
-        if not auth_header:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
+        clear_sub()
         try:
-            scheme, credentials = auth_header.split()
-        except ValueError:
-            return await call_next(request)
+            credentials = self._bearer_credentials(scope)
+            if credentials is not None:
+                try:
+                    token_data = verify_access_token(credentials)
+                    # Request-scoped slot read back by get_current_user via request.state
+                    state = scope.setdefault("state", {})
+                    state["token"] = credentials
+                    state["token_data"] = token_data
+                    if token_data:
+                        set_sub(str(token_data.user_id))
+                except Exception:
+                    pass
 
-        if scheme.lower() != "bearer":
-            return await call_next(request)
-
-        try:
-            token_data = decode_access_token(credentials)
-            if token_data:
-                set_sub(str(token_data.user_id))
-        except Exception:
-            pass
+            await self.app(scope, receive, send)
+        finally:
+            clear_sub()
 
-        response = await call_next(request)
-        return response
+    @staticmethod
+    def _bearer_credentials(scope: Scope):
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                try:
+                    scheme, credentials = value.decode("latin-1").split()
+                except ValueError:
+                    return None
+                if scheme.lower() != "bearer":
+                    return None
+                return credentials
+        return None
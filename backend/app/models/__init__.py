@@ -1,5 +1,8 @@
 from .observation import Observation
 from .location import Location
 from .user import User
+from .user_counter import UserCounter
+from .taxonomy import TaxonomyTerm
+from .observation_rollup import ObservationRollup
 
-__all__ = ["Observation", "Location", "User"]
+__all__ = ["Observation", "Location", "User", "UserCounter", "TaxonomyTerm", "ObservationRollup"]
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Integer, String, Float, Text, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime, timezone
 from ..database import Base
 
@@ -14,9 +14,28 @@ class Location(Base):
     longitude = Column(Float, nullable=True)
     description = Column(Text, nullable=True)
     address = Column(String, nullable=True)
+    geohash = Column(String(12, collation="C"), nullable=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('norwegian', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('norwegian', coalesce(address, '')), 'B') || "
+        "setweight(to_tsvector('norwegian', coalesce(description, '')), 'C')",
+        persisted=True,
+    )))
 
     observations = relationship("Observation", back_populates="location")
     user = relationship("User", back_populates="locations")
+
+    __table_args__ = (
+        Index("ix_locations_user_id_id", "user_id", "id"),
+        Index("ix_locations_user_id_name_id", "user_id", "name", "id"),
+        Index("ix_locations_user_id_address_id", "user_id", "address", "id"),
+        Index("ix_locations_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_locations_user_id_updated_at_id", "user_id", "updated_at", "id"),
+        Index("ix_locations_user_id_geohash", "user_id", "geohash"),
+        Index("ix_locations_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_locations_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_locations_address_trgm", "address", postgresql_using="gin", postgresql_ops={"address": "gin_trgm_ops"}),
+    )
@@ -1,21 +1,38 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Integer, DateTime, Text, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime, timezone
 from ..database import Base
 
+
 class Observation(Base):
     __tablename__ = "observations"
 
     id = Column(Integer, primary_key=True, index=True)
-    species = Column(String, nullable=False)
+    species_id = Column(Integer, ForeignKey("taxonomy_terms.id"), nullable=False)
     date = Column(DateTime(timezone=True), nullable=False)
-    location_id = Column(Integer, ForeignKey("locations.id", ondelete="SET NULL"), nullable=True)
+    location_id = Column(Integer, ForeignKey("locations.id", ondelete="SET NULL"), nullable=True, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     notes = Column(Text, nullable=True)
-    category = Column(String, nullable=False)
+    category_id = Column(Integer, ForeignKey("taxonomy_terms.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('norwegian', coalesce(notes, ''))", persisted=True)))
+
+    # species/category names are not mapped; app.taxonomy sets them from its cached id lookup
 
     location = relationship("Location", back_populates="observations")
     user = relationship("User", back_populates="observations")
+
+    __table_args__ = (
+        Index("ix_observations_user_id_id", "user_id", "id"),
+        Index("ix_observations_user_id_species_id_id", "user_id", "species_id", "id"),
+        Index("ix_observations_user_id_category_id_id", "user_id", "category_id", "id"),
+        Index("ix_observations_user_id_location_id_id", "user_id", "location_id", "id"),
+        Index("ix_observations_user_id_date_id", "user_id", "date", "id"),
+        # Small range index for date scans across users on the append-mostly table
+        Index("ix_observations_date_brin", "date", postgresql_using="brin"),
+        Index("ix_observations_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_observations_user_id_updated_at_id", "user_id", "updated_at", "id"),
+        Index("ix_observations_search_vector", "search_vector", postgresql_using="gin"),
+    )
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Date, Integer, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from ..database import Base
+
+
+class ObservationRollup(Base):
+    """Observation counts per user, local day, species and category."""
+    __tablename__ = "observation_rollups"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    species_id = Column(Integer, ForeignKey("taxonomy_terms.id"), primary_key=True)
+    category_id = Column(Integer, ForeignKey("taxonomy_terms.id"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Index, UniqueConstraint
+from ..database import Base
+
+
+class TaxonomyTerm(Base):
+    """Dictionary of species and category names referenced by observations."""
+    __tablename__ = "taxonomy_terms"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(16), nullable=False)
+    name = Column(String, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("kind", "name", name="uq_taxonomy_terms_kind_name"),
+        Index("ix_taxonomy_terms_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
@@ -0,0 +1,12 @@
+from sqlalchemy import BigInteger, Column, Integer, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from ..database import Base
+
+
+class UserCounter(Base):
+    __tablename__ = "user_counters"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    observation_count = Column(Integer, nullable=False, default=0)
+    location_count = Column(Integer, nullable=False, default=0)
+    data_version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,91 @@
+"""Minimal Mapbox Vector Tile (v2.1) encoder for point layers.
+
+The database has no PostGIS, so ST_AsMVT is not available. Points are all the
+map needs, which keeps the protobuf writer small enough to hand-roll.
+"""
+import struct
+from typing import Any, Dict, Iterable, List, Tuple
+
+EXTENT = 4096
+
+# Protobuf wire types
+VARINT = 0
+FIXED64 = 1
+LENGTH_DELIMITED = 2
+
+POINT = 1
+MOVE_TO = 1
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _bytes_field(field: int, payload: bytes) -> bytes:
+    return _key(field, LENGTH_DELIMITED) + _varint(len(payload)) + payload
+
+
+def _packed(field: int, values: Iterable[int]) -> bytes:
+    return _bytes_field(field, b"".join(_varint(value) for value in values))
+
+
+def _value(value: Any) -> bytes:
+    if isinstance(value, bool):
+        return _key(7, VARINT) + _varint(int(value))
+    if isinstance(value, int):
+        if value >= 0:
+            return _key(5, VARINT) + _varint(value)
+        return _key(6, VARINT) + _varint(_zigzag(value))
+    if isinstance(value, float):
+        return _key(3, FIXED64) + struct.pack("<d", value)
+    return _bytes_field(1, str(value).encode())
+
+
+def encode_layer(name: str, features: Iterable[Tuple[int, Tuple[int, int], Dict[str, Any]]], extent: int = EXTENT) -> bytes:
+    """Encode one layer of (id, (x, y) in tile units, properties) point features."""
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, Any], int] = {}
+    encoded_features: List[bytes] = []
+
+    for feature_id, (x, y), properties in features:
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            # Keyed on type too, so 1 and True stay distinct values
+            tags.append(values.setdefault((type(value), value), len(values)))
+        geometry = [(1 << 3) | MOVE_TO, _zigzag(x), _zigzag(y)]
+        encoded_features.append(
+            _key(1, VARINT) + _varint(feature_id)
+            + _packed(2, tags)
+            + _key(3, VARINT) + _varint(POINT)
+            + _packed(4, geometry)
+        )
+
+    layer = (
+        _key(15, VARINT) + _varint(2)
+        + _bytes_field(1, name.encode())
+        + b"".join(_bytes_field(2, feature) for feature in encoded_features)
+        + b"".join(_bytes_field(3, key.encode()) for key in keys)
+        + b"".join(_bytes_field(4, _value(value)) for _, value in values)
+        + _key(5, VARINT) + _varint(extent)
+    )
+    return _bytes_field(3, layer)
+
+
+def encode_tile(layers: Iterable[bytes]) -> bytes:
+    return b"".join(layers)
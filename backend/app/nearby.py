@@ -0,0 +1,39 @@
+"""k-nearest-neighbour search over a user's locations.
+
+Searches a small geohash-indexed box first and widens it until k locations
+are found inside the search circle or the radius limit is reached. Any
+location inside the circle is nearer than anything outside it, so the first
+k hits of a circle are the true k nearest.
+"""
+from typing import List, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .geo import bbox_filter, haversine_distance, radius_bbox
+from .models import Location as LocationModel
+
+INITIAL_RADIUS_M = 1000
+MAX_RADIUS_M = 200_000
+GROWTH_FACTOR = 4
+
+
+async def nearest_locations(db: AsyncSession, user_id: UUID, latitude: float, longitude: float, k: int, radius_m: float = MAX_RADIUS_M) -> List[Tuple[LocationModel, float]]:
+    distance = haversine_distance(LocationModel.latitude, LocationModel.longitude, latitude, longitude).label("distance_m")
+    search_radius = min(INITIAL_RADIUS_M, radius_m)
+    while True:
+        stmt = (
+            select(LocationModel, distance)
+            .where(
+                LocationModel.user_id == user_id,
+                bbox_filter(LocationModel.geohash, LocationModel.latitude, LocationModel.longitude, radius_bbox(latitude, longitude, search_radius)),
+                distance <= search_radius,
+            )
+            .order_by(distance, LocationModel.id)
+            .limit(k)
+        )
+        rows = (await db.execute(stmt)).all()
+        if len(rows) == k or search_radius >= radius_m:
+            return [(location, distance_m) for location, distance_m in rows]
+        search_radius = min(search_radius * GROWTH_FACTOR, radius_m)
@@ -0,0 +1,57 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, tuple_
+
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, row_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort_by, "o": sort_order, "v": value, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str, sort_column) -> Tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if payload["s"] != sort_by or payload["o"] != sort_order:
+            raise ValueError("Cursor was issued for a different sort")
+        value = payload["v"]
+        if value is not None and sort_column.type.python_type is datetime:
+            value = datetime.fromisoformat(value)
+        if value is not None and sort_column.type.python_type in (int, str) and not isinstance(value, sort_column.type.python_type):
+            raise ValueError("Cursor value does not match the sort column")
+        return value, int(payload["id"])
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_filter(sort_column, id_column, descending: bool, value: Any, last_id: int):
+    if sort_column is id_column:
+        return id_column < last_id if descending else id_column > last_id
+
+    # PostgreSQL sorts NULLs last ascending and first descending
+    if value is None:
+        if descending:
+            return or_(sort_column.isnot(None), and_(sort_column.is_(None), id_column < last_id))
+        return and_(sort_column.is_(None), id_column > last_id)
+
+    key = tuple_(sort_column, id_column)
+    after = key < tuple_(value, last_id) if descending else key > tuple_(value, last_id)
+    # Computed sort keys (column_property subqueries) are treated as nullable
+    if descending or not getattr(sort_column.expression, "nullable", True):
+        return after
+    return or_(after, sort_column.is_(None))
+
+
+def order_by_keyset(sort_column, id_column, descending: bool):
+    if sort_column is id_column:
+        return [id_column.desc() if descending else id_column.asc()]
+    if descending:
+        return [sort_column.desc(), id_column.desc()]
+    return [sort_column.asc(), id_column.asc()]
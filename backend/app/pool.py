@@ -0,0 +1,74 @@
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from .config import settings
+
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.hold_seconds_total = 0.0
+
+    def record_wait(self, wait: float) -> None:
+        self.wait_seconds_total += wait
+        if wait > self.wait_seconds_max:
+            self.wait_seconds_max = wait
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait in connect().
+
+    The wait covers queueing for a free slot, opening a new connection and
+    the pre-ping; the other numbers come from the pool events below.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        pool_stats.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def instrument_pool(pool: Pool) -> None:
+    @event.listens_for(pool, "connect")
+    def _connect(dbapi_connection, connection_record):
+        pool_stats.connects += 1
+
+    @event.listens_for(pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_stats.checkouts += 1
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(pool, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            pool_stats.hold_seconds_total += time.perf_counter() - checked_out_at
+
+
+def pool_snapshot(pool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        # overflow() starts at -size while the base slots are still unopened
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+        "checkouts": pool_stats.checkouts,
+        "connects": pool_stats.connects,
+        "timeouts": pool_stats.timeouts,
+        "wait_seconds_total": round(pool_stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(pool_stats.wait_seconds_max, 6),
+        "hold_seconds_total": round(pool_stats.hold_seconds_total, 6),
+    }
@@ -0,0 +1,81 @@
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .logging_context import get_sub
+from .query_timing import observe_queries
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+
+class QueryProfile:
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_seconds += elapsed
+        self.statements[statement] += 1
+
+
+profile_context: ContextVar[Optional[QueryProfile]] = ContextVar('query_profile', default=None)
+
+
+def _redacted(parameters) -> str:
+    if not parameters:
+        return "none"
+    count = len(parameters) if isinstance(parameters, (list, tuple, dict)) else 1
+    return f"<{count} redacted>"
+
+
+def _record_query(statement: str, parameters, elapsed: float) -> None:
+    profile = profile_context.get()
+    if profile is not None:
+        profile.record(statement, elapsed)
+    if elapsed * 1000 >= settings.slow_query_threshold_ms:
+        slow_query_logger.warning(f"Slow query ({elapsed * 1000:.1f} ms, params={_redacted(parameters)}): {' '.join(statement.split())}")
+
+
+def profile_engine(engine) -> None:
+    observe_queries(engine, on_query=_record_query)
+
+
+class SqlProfilerMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = profile_context.set(profile)
+
+        async def send_wrapper(message: Message):
+            if settings.debug and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(profile.count).encode()))
+                headers.append((b"x-query-time-ms", f"{profile.total_seconds * 1000:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile_context.reset(token)
+            if profile.count:
+                route = getattr(scope.get("route"), "path", None) or scope["path"]
+                # sub is still set here: LoggingMiddleware wraps this middleware and clears it afterwards
+                attribution = {"route": route, "sub": get_sub() or "-"}
+                logger.info(f"SQL profile {scope['method']} {route}: {profile.count} queries, {profile.total_seconds * 1000:.1f} ms", extra=attribution)
+                statement, repeats = profile.statements.most_common(1)[0]
+                if repeats >= settings.sql_repeat_warning_threshold:
+                    logger.warning(f"Possible N+1 on {scope['method']} {route}: statement ran {repeats} times: {' '.join(statement.split())}", extra=attribution)
@@ -0,0 +1,48 @@
+import time
+from typing import Any, Callable, Dict, List, Optional
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QueryObserver = Callable[[str, Any, float], None]
+ErrorObserver = Callable[[Any], None]
+
+_observers: "WeakKeyDictionary[Engine, Dict[str, List[Callable]]]" = WeakKeyDictionary()
+
+
+def observe_queries(engine, on_query: Optional[QueryObserver] = None, on_error: Optional[ErrorObserver] = None) -> None:
+    """Call on_query(statement, parameters, seconds) after every statement and on_error(context) on failures.
+
+    Metrics and the SQL profiler share one pair of cursor listeners per engine,
+    so each statement is timed once whichever of them is enabled.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    observers = _observers.get(sync_engine)
+    if observers is None:
+        observers = _observers[sync_engine] = {"query": [], "error": []}
+        _listen(sync_engine, observers)
+    if on_query is not None:
+        observers["query"].append(on_query)
+    if on_error is not None:
+        observers["error"].append(on_error)
+
+
+def _listen(sync_engine: Engine, observers: Dict[str, List[Callable]]) -> None:
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        for observer in observers["query"]:
+            observer(statement, parameters, elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(context):
+        starts = context.connection.info.get("query_start_time") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        for observer in observers["error"]:
+            observer(context)
@@ -0,0 +1,49 @@
+"""Final JSON bytes of list/detail responses, keyed on the user's data version.
+
+Every write bumps the version, so entries never need invalidating; entries
+for old versions simply age out of the LRU.
+"""
+from typing import Any, Hashable, Optional
+from uuid import UUID
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from .cache import TTLCache
+from .config import settings
+from .serialization import dumps
+
+response_cache = TTLCache(
+    "responses",
+    settings.response_cache_size,
+    settings.response_cache_ttl_seconds,
+    maxbytes=settings.response_cache_max_bytes,
+)
+
+
+def response_key(request: Request, user_id: UUID, version: int) -> Hashable:
+    # Sorted so that reordered query strings share an entry
+    return user_id, version, request.url.path, tuple(sorted(request.query_params.multi_items()))
+
+
+def json_response(content: bytes, response: Response) -> Response:
+    # Returning a Response bypasses FastAPI's merge of dependency-set headers (ETag)
+    return Response(content=content, media_type="application/json", headers=dict(response.headers))
+
+
+def cached_response(key: Hashable, response: Response) -> Optional[Response]:
+    content = response_cache.get(key)
+    return None if content is None else json_response(content, response)
+
+
+def store_response(key: Hashable, adapter: TypeAdapter, data: Any, response: Response) -> Response:
+    content = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    response_cache.set(key, content)
+    return json_response(content, response)
+
+
+def store_json(key: Hashable, data: Any, response: Response) -> Response:
+    # For data already shaped like the response model; skips validation
+    content = dumps(data)
+    response_cache.set(key, content)
+    return json_response(content, response)
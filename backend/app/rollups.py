@@ -0,0 +1,78 @@
+"""Per-user statistics rollups, kept current by the observation write paths."""
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .models import ObservationRollup, TaxonomyTerm
+
+RollupKey = Tuple[date, int, int]
+
+STATS_ZONE = ZoneInfo(settings.stats_timezone)
+
+
+def rollup_key(observed_at: datetime, species_id: int, category_id: int) -> RollupKey:
+    return observed_at.astimezone(STATS_ZONE).date(), species_id, category_id
+
+
+async def adjust_rollups(db: AsyncSession, user_id: UUID, deltas: Dict[RollupKey, int]) -> None:
+    deltas = {key: delta for key, delta in Counter(deltas).items() if delta}
+    if not deltas:
+        return
+
+    stmt = insert(ObservationRollup).values([
+        {"user_id": user_id, "day": day, "species_id": species_id, "category_id": category_id, "count": delta}
+        for (day, species_id, category_id), delta in sorted(deltas.items())
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[ObservationRollup.user_id, ObservationRollup.day, ObservationRollup.species_id, ObservationRollup.category_id],
+        set_={"count": ObservationRollup.count + stmt.excluded.count},
+    ))
+
+    emptied = [key for key, delta in deltas.items() if delta < 0]
+    if emptied:
+        await db.execute(delete(ObservationRollup).where(
+            ObservationRollup.user_id == user_id,
+            tuple_(ObservationRollup.day, ObservationRollup.species_id, ObservationRollup.category_id).in_(emptied),
+            ObservationRollup.count <= 0,
+        ))
+
+
+async def get_stats(db: AsyncSession, user_id: UUID, year: Optional[int], top: int) -> dict:
+    scope = ObservationRollup.user_id == user_id
+    if year is not None:
+        scope = and_(scope, ObservationRollup.day >= date(year, 1, 1), ObservationRollup.day < date(year + 1, 1, 1))
+
+    month = func.to_char(ObservationRollup.day, "YYYY-MM")
+    per_month = await db.execute(
+        select(month.label("month"), func.sum(ObservationRollup.count).label("count"))
+        .where(scope).group_by(month).order_by(month)
+    )
+
+    species_total = func.sum(ObservationRollup.count)
+    top_species = await db.execute(
+        select(TaxonomyTerm.name.label("species"), species_total.label("count"))
+        .join(TaxonomyTerm, TaxonomyTerm.id == ObservationRollup.species_id)
+        .where(scope).group_by(TaxonomyTerm.name).order_by(species_total.desc(), TaxonomyTerm.name).limit(top)
+    )
+
+    per_category = await db.execute(
+        select(TaxonomyTerm.name.label("category"), func.sum(ObservationRollup.count).label("count"))
+        .join(TaxonomyTerm, TaxonomyTerm.id == ObservationRollup.category_id)
+        .where(scope).group_by(TaxonomyTerm.name).order_by(TaxonomyTerm.name)
+    )
+
+    per_month = [row._asdict() for row in per_month]
+    return {
+        "year": year,
+        "total": sum(row["count"] for row in per_month),
+        "per_month": per_month,
+        "top_species": [row._asdict() for row in top_species],
+        "per_category": [row._asdict() for row in per_category],
+    }
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 from ..database import get_db
 from ..models import User as UserModel
@@ -8,7 +9,8 @@ from ..auth import (
     create_access_token,
     exchange_code_for_token,
     get_user_info,
-    get_current_user
+    get_current_user,
+    user_cache
 )
 from ..config import settings
 
@@ -29,7 +31,7 @@ def get_login_url():
 @router.post("/callback", response_model=Token)
 async def auth_callback(
     code: str = Query(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     redirect_uri = f"{settings.frontend_url}/auth/callback"
 
@@ -57,14 +59,15 @@ async def auth_callback(
         logger.error(f"Email not provided by Keycloak for sub={keycloak_id}")
         raise HTTPException(status_code=400, detail="Email not provided by identity provider")
 
-    user = db.query(UserModel).filter(UserModel.keycloak_id == keycloak_id).first()
+    user = await db.scalar(select(UserModel).where(UserModel.keycloak_id == keycloak_id))
 
     if user:
         logger.info(f"Existing user login: id={user.id}, email={email}, keycloak_id={keycloak_id}")
         user.email = email
         user.name = name
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        user_cache.invalidate(user.id)
     else:
         user = UserModel(
             keycloak_id=keycloak_id,
@@ -72,8 +75,8 @@ async def auth_callback(
             name=name
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         logger.info(f"New user created: id={user.id}, email={email}, keycloak_id={keycloak_id}")
 
     access_token = create_access_token(
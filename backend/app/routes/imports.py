@@ -0,0 +1,23 @@
+import csv
+import io
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db
+from ..models import User as UserModel
+from ..schemas import ImportResponse
+from ..auth import get_current_user
+from ..importer import ImportFormat, ImportFormatError, ImportKind, import_rows
+
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+@router.post("/{kind}", response_model=ImportResponse, status_code=201)
+async def import_file(kind: ImportKind, format: ImportFormat = ImportFormat.csv, file: UploadFile = File(...), db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    # The upload is already spooled to a temporary file; wrap it instead of reading it into memory
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return await import_rows(db, current_user.id, kind, format, stream)
+    except (ImportFormatError, UnicodeDecodeError, csv.Error) as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"Could not parse {format.value} upload: {e}")
+    finally:
+        stream.detach()
@@ -1,15 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select, func, insert, delete, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
+from typing import Any, List, Optional
 from enum import Enum
+from uuid import UUID
 from ..database import get_db
 from ..models import Location as LocationModel, Observation as ObservationModel, User as UserModel
-from ..schemas import Location, LocationCreate, LocationUpdate, LocationWithCount, PaginatedResponse
+from ..schemas import Location, LocationCreate, LocationUpdate, LocationWithCount, PaginatedResponse, BatchResponse, ClusterResponse, NearbyLocation
 from ..auth import get_current_user
+from ..etag import conditional_get
+from ..response_cache import cached_response, response_key, store_json, store_response
+from ..serialization import LOCATION_COLUMNS, location_record
+from ..batch import validate_batch
+from ..counters import CountMode, adjust_counts, bump_data_version, count_total
+from ..pagination import encode_cursor, decode_cursor, keyset_filter, order_by_keyset
+from ..geo import bbox_filter, location_geohash, parse_bbox
+from ..clusters import get_clusters
+from ..nearby import MAX_RADIUS_M, nearest_locations
 
 router = APIRouter(prefix="/locations", tags=["locations"])
 
+LOCATION = TypeAdapter(LocationWithCount)
+
 class LocationSortField(str, Enum):
     id = "id"
     name = "name"
@@ -21,20 +34,57 @@ class SortOrder(str, Enum):
     asc = "asc"
     desc = "desc"
 
+async def get_owned_location(db: AsyncSession, location_id: int, user_id: UUID) -> Optional[LocationModel]:
+    return await db.scalar(select(LocationModel).where(
+        LocationModel.id == location_id,
+        LocationModel.user_id == user_id
+    ))
+
 @router.get("", response_model=PaginatedResponse[LocationWithCount])
-def get_locations(skip: int = 0, limit: int = 100, sort_by: LocationSortField = LocationSortField.id, sort_order: SortOrder = SortOrder.desc, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
-    total = db.query(LocationModel).filter(LocationModel.user_id == current_user.id).count()
+async def get_locations(request: Request, response: Response, skip: int = 0, limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None, count: CountMode = CountMode.estimated, bbox: Optional[str] = None, sort_by: LocationSortField = LocationSortField.id, sort_order: SortOrder = SortOrder.desc, version: int = Depends(conditional_get), db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    key = response_key(request, current_user.id, version)
+    cached = cached_response(key, response)
+    if cached is not None:
+        return cached
+
+    owned = LocationModel.user_id == current_user.id
+    if bbox:
+        owned = and_(owned, bbox_filter(LocationModel.geohash, LocationModel.latitude, LocationModel.longitude, parse_bbox(bbox)))
+    total = await count_total(db, current_user.id, count, "location_count", select(func.count(LocationModel.id)).where(owned), filtered=bool(bbox))
     sort_field = getattr(LocationModel, sort_by.value)
-    order_func = sort_field.asc() if sort_order == SortOrder.asc else sort_field.desc()
+    descending = sort_order == SortOrder.desc
 
-    locations_query = db.query(
-        LocationModel,
+    # Plain column tuples: no ORM objects to hydrate and no per-row validation
+    locations_query = select(
+        *LOCATION_COLUMNS,
         func.count(ObservationModel.id).label('observation_count')
-    ).filter(LocationModel.user_id == current_user.id).outerjoin(ObservationModel).group_by(LocationModel.id).order_by(order_func).offset(skip).limit(limit).all()
-
-    locations = []
-    for location, count in locations_query:
-        location_dict = {
+    ).where(owned)
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_by.value, sort_order.value, sort_field)
+        locations_query = locations_query.where(keyset_filter(sort_field, LocationModel.id, descending, value, last_id))
+    else:
+        locations_query = locations_query.offset(skip)
+    locations_query = locations_query.outerjoin(ObservationModel).group_by(LocationModel.id).order_by(*order_by_keyset(sort_field, LocationModel.id, descending))
+    locations = [location_record(row) for row in await db.execute(locations_query.limit(limit + 1))]
+
+    next_cursor = None
+    if len(locations) > limit:
+        locations = locations[:limit]
+        last = locations[-1]
+        next_cursor = encode_cursor(sort_by.value, sort_order.value, last[sort_by.value], last["id"])
+
+    return store_json(key, {"data": locations, "total": total, "next_cursor": next_cursor}, response)
+
+@router.get("/clusters", response_model=ClusterResponse)
+async def get_location_clusters(bbox: str, zoom: int = Query(..., ge=0, le=22), db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    clusters = await get_clusters(db, current_user.id, parse_bbox(bbox), zoom)
+    return {"zoom": zoom, "data": clusters}
+
+@router.get("/nearby", response_model=List[NearbyLocation])
+async def get_nearby_locations(lat: float = Query(..., ge=-90, le=90), lon: float = Query(..., ge=-180, le=180), k: int = Query(5, ge=1, le=100), radius_m: float = Query(MAX_RADIUS_M, gt=0, le=MAX_RADIUS_M), db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    rows = await nearest_locations(db, current_user.id, lat, lon, k, radius_m)
+    return [
+        {
             "id": location.id,
             "name": location.name,
             "latitude": location.latitude,
@@ -44,24 +94,25 @@ def get_locations(skip: int = 0, limit: int = 100, sort_by: LocationSortField =
             "user_id": location.user_id,
             "created_at": location.created_at,
             "updated_at": location.updated_at,
-            "observation_count": count
+            "distance_m": distance_m
         }
-        locations.append(location_dict)
-
-    return {"data": locations, "total": total}
+        for location, distance_m in rows
+    ]
 
 @router.get("/{location_id}", response_model=LocationWithCount)
-def get_location(location_id: int, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
-    location = db.query(LocationModel).filter(
-        LocationModel.id == location_id,
-        LocationModel.user_id == current_user.id
-    ).first()
+async def get_location(request: Request, response: Response, location_id: int, version: int = Depends(conditional_get), db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    key = response_key(request, current_user.id, version)
+    cached = cached_response(key, response)
+    if cached is not None:
+        return cached
+
+    location = await get_owned_location(db, location_id, current_user.id)
     if not location:
         raise HTTPException(status_code=404, detail="Location not found")
 
-    observation_count = db.query(func.count(ObservationModel.id)).filter(ObservationModel.location_id == location_id).scalar()
+    observation_count = await db.scalar(select(func.count(ObservationModel.id)).where(ObservationModel.location_id == location_id))
 
-    return {
+    return store_response(key, LOCATION, {
         "id": location.id,
         "name": location.name,
         "latitude": location.latitude,
@@ -72,42 +123,58 @@ def get_location(location_id: int, db: Session = Depends(get_db), current_user:
         "created_at": location.created_at,
         "updated_at": location.updated_at,
         "observation_count": observation_count
-    }
+    }, response)
 
 @router.post("", response_model=Location, status_code=201)
-def create_location(location: LocationCreate, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
-    db_location = LocationModel(**location.model_dump(), user_id=current_user.id)
+async def create_location(location: LocationCreate, db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    db_location = LocationModel(**location.model_dump(), user_id=current_user.id, geohash=location_geohash(location.latitude, location.longitude))
     db.add(db_location)
-    db.commit()
-    db.refresh(db_location)
+    await db.flush()
+    await adjust_counts(db, current_user.id, locations=1)
+    await db.commit()
+    await db.refresh(db_location)
     return db_location
 
+@router.post("/batch", response_model=BatchResponse[Location], status_code=201)
+async def create_locations_batch(items: List[Any] = Body(...), db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    valid, errors = validate_batch(LocationCreate, items)
+
+    created = []
+    if valid:
+        rows = [{**item.model_dump(), "user_id": current_user.id, "geohash": location_geohash(item.latitude, item.longitude)} for _, item in valid]
+        created = (await db.scalars(insert(LocationModel).returning(LocationModel, sort_by_parameter_order=True), rows)).all()
+        await adjust_counts(db, current_user.id, locations=len(created))
+        await db.commit()
+
+    return {"data": created, "errors": errors}
+
 @router.put("/{location_id}", response_model=Location)
-def update_location(location_id: int, location: LocationUpdate, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
-    db_location = db.query(LocationModel).filter(
-        LocationModel.id == location_id,
-        LocationModel.user_id == current_user.id
-    ).first()
+async def update_location(location_id: int, location: LocationUpdate, db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    db_location = await get_owned_location(db, location_id, current_user.id)
     if not db_location:
         raise HTTPException(status_code=404, detail="Location not found")
 
     update_data = location.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_location, key, value)
+    db_location.geohash = location_geohash(db_location.latitude, db_location.longitude)
 
-    db.commit()
-    db.refresh(db_location)
+    await bump_data_version(db, current_user.id)
+    await db.commit()
+    await db.refresh(db_location)
     return db_location
 
 @router.delete("/{location_id}", status_code=204)
-def delete_location(location_id: int, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
-    db_location = db.query(LocationModel).filter(
-        LocationModel.id == location_id,
-        LocationModel.user_id == current_user.id
-    ).first()
-    if not db_location:
+async def delete_location(location_id: int, db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    # Only the request whose DELETE removed the row adjusts the counters; observations are unlinked by the FK
+    deleted = await db.scalar(
+        delete(LocationModel)
+        .where(LocationModel.id == location_id, LocationModel.user_id == current_user.id)
+        .returning(LocationModel.id)
+    )
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Location not found")
 
-    db.delete(db_location)
-    db.commit()
+    await adjust_counts(db, current_user.id, locations=-1)
+    await db.commit()
     return None
@@ -1,14 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func, insert, delete, and_, false
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from pydantic import TypeAdapter
+from collections import Counter
+from datetime import datetime
+from typing import Any, List, Optional
 from enum import Enum
+from uuid import UUID
 from ..database import get_db
-from ..models import Observation as ObservationModel, User as UserModel
-from ..schemas import Observation, ObservationCreate, ObservationUpdate, PaginatedResponse
+from ..models import Observation as ObservationModel, Location as LocationModel, User as UserModel, TaxonomyTerm
+from ..schemas import Observation, ObservationCreate, ObservationUpdate, PaginatedResponse, BatchResponse
 from ..auth import get_current_user
+from ..etag import conditional_get
+from ..response_cache import cached_response, response_key, store_json, store_response
+from ..serialization import LOCATION_COLUMNS, OBSERVATION_COLUMNS, TERM_COLUMNS, observation_record, observation_term_ids
+from ..batch import validate_batch
+from ..export import ExportFormat, MEDIA_TYPES, stream_observations
+from ..counters import CountMode, adjust_counts, bump_data_version, count_total
+from ..pagination import encode_cursor, decode_cursor, keyset_filter, order_by_keyset
+from ..geo import bbox_filter, parse_bbox
+from ..species import record_species
+from ..taxonomy import TermKind, attach_term_names, lookup_terms, observation_values, set_term_names, term_names
+from ..rollups import adjust_rollups, rollup_key
 
 router = APIRouter(prefix="/observations", tags=["observations"])
 
+OBSERVATION = TypeAdapter(Observation)
+
 class ObservationSortField(str, Enum):
     id = "id"
     species = "species"
@@ -21,59 +42,195 @@ class SortOrder(str, Enum):
     asc = "asc"
     desc = "desc"
 
+async def get_owned_observation(db: AsyncSession, observation_id: int, user_id: UUID, with_location: bool = False, for_update: bool = False) -> Optional[ObservationModel]:
+    stmt = select(ObservationModel).where(
+        ObservationModel.id == observation_id,
+        ObservationModel.user_id == user_id
+    )
+    if with_location:
+        stmt = stmt.options(joinedload(ObservationModel.location))
+    if for_update:
+        # Writers serialize on the row, so rollup and counter adjustments start from the committed values
+        stmt = stmt.with_for_update(of=ObservationModel)
+    return await db.scalar(stmt)
+
+async def term_filter(db: AsyncSession, kind: TermKind, column, name: str):
+    term_id = (await lookup_terms(db, kind, [name])).get(name)
+    # An unknown name cannot match any observation
+    return false() if term_id is None else column == term_id
+
 @router.get("", response_model=PaginatedResponse[Observation])
-def get_observations(skip: int = 0, limit: int = 100, sort_by: ObservationSortField = ObservationSortField.id, sort_order: SortOrder = SortOrder.desc, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
-    base_query = db.query(ObservationModel).filter(ObservationModel.user_id == current_user.id)
-    total = base_query.count()
-    sort_field = getattr(ObservationModel, sort_by.value)
-    order_func = sort_field.asc() if sort_order == SortOrder.asc else sort_field.desc()
-    observations = base_query.options(joinedload(ObservationModel.location)).order_by(order_func).offset(skip).limit(limit).all()
-    return {"data": observations, "total": total}
+async def get_observations(request: Request, response: Response, skip: int = 0, limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None, count: CountMode = CountMode.estimated, bbox: Optional[str] = None, category: Optional[str] = None, species: Optional[str] = None, location_id: Optional[int] = None, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None, updated_since: Optional[datetime] = None, sort_by: ObservationSortField = ObservationSortField.id, sort_order: SortOrder = SortOrder.desc, version: int = Depends(conditional_get), db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    key = response_key(request, current_user.id, version)
+    cached = cached_response(key, response)
+    if cached is not None:
+        return cached
+
+    filters = []
+    if category is not None:
+        filters.append(await term_filter(db, TermKind.category, ObservationModel.category_id, category))
+    if species is not None:
+        filters.append(await term_filter(db, TermKind.species, ObservationModel.species_id, species))
+    if location_id is not None:
+        filters.append(ObservationModel.location_id == location_id)
+    if date_from is not None:
+        filters.append(ObservationModel.date >= date_from)
+    if date_to is not None:
+        filters.append(ObservationModel.date <= date_to)
+    if updated_since is not None:
+        filters.append(ObservationModel.updated_at >= updated_since)
+    owned = and_(ObservationModel.user_id == current_user.id, *filters)
+    if bbox:
+        # Observations have no coordinates of their own; filter through their location
+        located = select(LocationModel.id).where(
+            LocationModel.user_id == current_user.id,
+            bbox_filter(LocationModel.geohash, LocationModel.latitude, LocationModel.longitude, parse_bbox(bbox))
+        )
+        owned = and_(owned, ObservationModel.location_id.in_(located))
+    total = await count_total(db, current_user.id, count, "observation_count", select(func.count(ObservationModel.id)).where(owned), filtered=bool(bbox or filters))
+    descending = sort_order == SortOrder.desc
+
+    # Plain column tuples: no ORM objects to hydrate and no per-row validation
+    page_query = select(*OBSERVATION_COLUMNS, *LOCATION_COLUMNS).outerjoin(ObservationModel.location).where(owned)
+    if sort_by.value in TERM_COLUMNS:
+        # Names sort alphabetically through the dictionary, not by term id
+        term = aliased(TaxonomyTerm)
+        page_query = page_query.join(term, term.id == TERM_COLUMNS[sort_by.value])
+        sort_field = term.name
+    else:
+        sort_field = getattr(ObservationModel, sort_by.value)
+    page_query = page_query.order_by(*order_by_keyset(sort_field, ObservationModel.id, descending))
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_by.value, sort_order.value, sort_field)
+        page_query = page_query.where(keyset_filter(sort_field, ObservationModel.id, descending, value, last_id))
+    else:
+        page_query = page_query.offset(skip)
+    rows = (await db.execute(page_query.limit(limit + 1))).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    names = await term_names(db, observation_term_ids(rows))
+    observations = [observation_record(row, names) for row in rows]
+
+    next_cursor = None
+    if has_more:
+        # Records carry the names, so species and category cursors hold the name they sort by
+        last = observations[-1]
+        next_cursor = encode_cursor(sort_by.value, sort_order.value, last[sort_by.value], last["id"])
+    return store_json(key, {"data": observations, "total": total, "next_cursor": next_cursor}, response)
+
+@router.get("/export")
+async def export_observations(format: ExportFormat = ExportFormat.ndjson, current_user: UserModel = Depends(get_current_user)):
+    return StreamingResponse(
+        stream_observations(current_user.id, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="observations.{format.value}"'}
+    )
 
 @router.get("/{observation_id}", response_model=Observation)
-def get_observation(observation_id: int, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
-    observation = db.query(ObservationModel).options(joinedload(ObservationModel.location)).filter(
-        ObservationModel.id == observation_id,
-        ObservationModel.user_id == current_user.id
-    ).first()
+async def get_observation(request: Request, response: Response, observation_id: int, version: int = Depends(conditional_get), db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    key = response_key(request, current_user.id, version)
+    cached = cached_response(key, response)
+    if cached is not None:
+        return cached
+
+    observation = await get_owned_observation(db, observation_id, current_user.id, with_location=True)
     if not observation:
         raise HTTPException(status_code=404, detail="Observation not found")
-    return observation
+    await attach_term_names(db, [observation])
+    return store_response(key, OBSERVATION, observation, response)
 
 @router.post("", response_model=Observation, status_code=201)
-def create_observation(observation: ObservationCreate, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
-    db_observation = ObservationModel(**observation.model_dump(), user_id=current_user.id)
+async def create_observation(observation: ObservationCreate, db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    [values] = await observation_values(db, [observation.model_dump()])
+    db_observation = ObservationModel(**values, user_id=current_user.id)
     db.add(db_observation)
-    db.commit()
-    db.refresh(db_observation)
+    await db.flush()
+    await adjust_counts(db, current_user.id, observations=1)
+    await adjust_rollups(db, current_user.id, {rollup_key(db_observation.date, db_observation.species_id, db_observation.category_id): 1})
+    await db.commit()
+    set_term_names(db_observation, observation.species, observation.category)
+    record_species(current_user.id, added=[observation.species])
+    await db.refresh(db_observation, ["location"])
     return db_observation
 
+@router.post("/batch", response_model=BatchResponse[Observation], status_code=201)
+async def create_observations_batch(items: List[Any] = Body(...), db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    valid, errors = validate_batch(ObservationCreate, items)
+
+    location_ids = {item.location_id for _, item in valid if item.location_id is not None}
+    locations = {}
+    if location_ids:
+        owned_locations = await db.scalars(select(LocationModel).where(
+            LocationModel.id.in_(location_ids),
+            LocationModel.user_id == current_user.id
+        ))
+        locations = {location.id: location for location in owned_locations}
+
+    accepted = []
+    for index, item in valid:
+        if item.location_id is not None and item.location_id not in locations:
+            errors.append({"index": index, "detail": "Location not found"})
+            continue
+        accepted.append(item)
+
+    created = []
+    if accepted:
+        rows = await observation_values(db, [{**item.model_dump(), "user_id": current_user.id} for item in accepted])
+        created = (await db.scalars(insert(ObservationModel).returning(ObservationModel, sort_by_parameter_order=True), rows)).all()
+        await adjust_counts(db, current_user.id, observations=len(created))
+        await adjust_rollups(db, current_user.id, Counter(rollup_key(db_observation.date, db_observation.species_id, db_observation.category_id) for db_observation in created))
+        await db.commit()
+        record_species(current_user.id, added=[item.species for item in accepted])
+        for db_observation, item in zip(created, accepted):
+            set_term_names(db_observation, item.species, item.category)
+            set_committed_value(db_observation, "location", locations.get(db_observation.location_id))
+
+    errors.sort(key=lambda error: error["index"])
+    return {"data": created, "errors": errors}
+
 @router.put("/{observation_id}", response_model=Observation)
-def update_observation(observation_id: int, observation: ObservationUpdate, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
-    db_observation = db.query(ObservationModel).filter(
-        ObservationModel.id == observation_id,
-        ObservationModel.user_id == current_user.id
-    ).first()
+async def update_observation(observation_id: int, observation: ObservationUpdate, db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    db_observation = await get_owned_observation(db, observation_id, current_user.id, for_update=True)
     if not db_observation:
         raise HTTPException(status_code=404, detail="Observation not found")
 
-    update_data = observation.model_dump(exclude_unset=True)
+    await attach_term_names(db, [db_observation])
+    previous_species = db_observation.species
+    # species and category are required, so an explicit null leaves them unchanged
+    update_data = {key: value for key, value in observation.model_dump(exclude_unset=True).items() if value is not None or key not in ("species", "category")}
+    species = update_data.get("species", previous_species)
+    category = update_data.get("category", db_observation.category)
+    [update_data] = await observation_values(db, [update_data])
+    previous_key = rollup_key(db_observation.date, db_observation.species_id, db_observation.category_id)
     for key, value in update_data.items():
         setattr(db_observation, key, value)
+    current_key = rollup_key(db_observation.date, db_observation.species_id, db_observation.category_id)
 
-    db.commit()
-    db.refresh(db_observation)
+    await bump_data_version(db, current_user.id)
+    if current_key != previous_key:
+        await adjust_rollups(db, current_user.id, {previous_key: -1, current_key: 1})
+    await db.commit()
+    set_term_names(db_observation, species, category)
+    if species != previous_species:
+        record_species(current_user.id, added=[species], removed=[previous_species])
+    await db.refresh(db_observation, ["location"])
     return db_observation
 
 @router.delete("/{observation_id}", status_code=204)
-def delete_observation(observation_id: int, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
-    db_observation = db.query(ObservationModel).filter(
-        ObservationModel.id == observation_id,
-        ObservationModel.user_id == current_user.id
-    ).first()
-    if not db_observation:
+async def delete_observation(observation_id: int, db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    # Only the request whose DELETE removed the row adjusts counters and rollups, from the values it removed
+    deleted = (await db.execute(
+        delete(ObservationModel)
+        .where(ObservationModel.id == observation_id, ObservationModel.user_id == current_user.id)
+        .returning(ObservationModel.date, ObservationModel.species_id, ObservationModel.category_id)
+    )).one_or_none()
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Observation not found")
 
-    db.delete(db_observation)
-    db.commit()
+    await adjust_counts(db, current_user.id, observations=-1)
+    await adjust_rollups(db, current_user.id, {rollup_key(deleted.date, deleted.species_id, deleted.category_id): -1})
+    names = await term_names(db, {deleted.species_id})
+    await db.commit()
+    record_species(current_user.id, removed=[names[deleted.species_id]])
     return None
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from ..database import get_db
+from ..models import User as UserModel
+from ..schemas import SearchResponse
+from ..auth import get_current_user
+from ..search import search
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.get("", response_model=SearchResponse)
+async def search_all(q: str = Query(..., min_length=1, max_length=200), limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = None, db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    return await search(db, current_user.id, q, limit, cursor)
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from ..database import get_db
+from ..models import User as UserModel
+from ..schemas import SpeciesSuggestion
+from ..auth import get_current_user
+from ..species import suggest_species
+
+router = APIRouter(prefix="/species", tags=["species"])
+
+@router.get("/suggest", response_model=List[SpeciesSuggestion])
+async def get_species_suggestions(prefix: str = Query(..., min_length=1, max_length=100), limit: int = Query(10, ge=1, le=50), db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    return await suggest_species(db, current_user.id, prefix, limit)
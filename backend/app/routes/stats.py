@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from ..database import get_db
+from ..models import User as UserModel
+from ..schemas import StatsResponse
+from ..auth import get_current_user
+from ..rollups import get_stats
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+@router.get("", response_model=StatsResponse)
+async def get_observation_stats(year: Optional[int] = Query(None, ge=1, le=9998), top: int = Query(10, ge=1, le=100), db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    return await get_stats(db, current_user.id, year, top)
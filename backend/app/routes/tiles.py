@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db
+from ..models import User as UserModel
+from ..auth import get_current_user
+from ..etag import conditional_get
+from ..tiles import render_tile, tile_cache
+
+router = APIRouter(prefix="/tiles", tags=["tiles"])
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+@router.get("/{z}/{x}/{y}.pbf")
+async def get_tile(response: Response, z: int = Path(..., ge=0, le=22), x: int = Path(..., ge=0), y: int = Path(..., ge=0), version: int = Depends(conditional_get), db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+    if x >= 1 << z or y >= 1 << z:
+        raise HTTPException(status_code=404, detail="Tile not found")
+
+    key = (current_user.id, version, z, x, y)
+    content = tile_cache.get(key)
+    if content is None:
+        content = await render_tile(db, current_user.id, z, x, y)
+        tile_cache.set(key, content)
+    return Response(content=content, media_type=MVT_MEDIA_TYPE, headers=dict(response.headers))
@@ -1,9 +1,19 @@
 from .observation import Observation, ObservationCreate, ObservationUpdate, PaginatedResponse
-from .location import Location, LocationCreate, LocationUpdate, LocationWithCount
+from .location import Location, LocationCreate, LocationUpdate, LocationWithCount, NearbyLocation
 from .user import User, UserCreate, UserUpdate, Token, TokenData
+from .batch import BatchItemError, BatchResponse, ImportResponse
+from .cluster import ClusterItem, ClusterResponse
+from .search import SearchHit, SearchResponse
+from .species import SpeciesSuggestion
+from .stats import MonthCount, SpeciesCount, CategoryCount, StatsResponse
 
 __all__ = [
     "Observation", "ObservationCreate", "ObservationUpdate", "PaginatedResponse",
-    "Location", "LocationCreate", "LocationUpdate", "LocationWithCount",
-    "User", "UserCreate", "UserUpdate", "Token", "TokenData"
+    "Location", "LocationCreate", "LocationUpdate", "LocationWithCount", "NearbyLocation",
+    "User", "UserCreate", "UserUpdate", "Token", "TokenData",
+    "BatchItemError", "BatchResponse", "ImportResponse",
+    "ClusterItem", "ClusterResponse",
+    "SearchHit", "SearchResponse",
+    "SpeciesSuggestion",
+    "MonthCount", "SpeciesCount", "CategoryCount", "StatsResponse"
 ]
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Any, List, Generic, TypeVar
+
+T = TypeVar('T')
+
+class BatchItemError(BaseModel):
+    index: int
+    detail: Any
+
+class BatchResponse(BaseModel, Generic[T]):
+    data: List[T]
+    errors: List[BatchItemError]
+
+class ImportResponse(BaseModel):
+    received: int
+    imported: int
+    rejected: int
+    errors: List[BatchItemError]
+    errors_truncated: bool
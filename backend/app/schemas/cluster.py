@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+
+class ClusterItem(BaseModel):
+    type: Literal["cluster", "point"]
+    latitude: float
+    longitude: float
+    count: int
+    observation_count: int
+    location_id: Optional[int] = None
+    name: Optional[str] = None
+
+
+class ClusterResponse(BaseModel):
+    zoom: int
+    data: List[ClusterItem]
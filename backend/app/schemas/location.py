@@ -44,3 +44,7 @@ class Location(LocationBase):
 
 class LocationWithCount(Location):
     observation_count: int
+
+
+class NearbyLocation(Location):
+    distance_m: float
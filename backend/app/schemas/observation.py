@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import datetime, timezone
 from typing import Optional, List, Generic, TypeVar, TYPE_CHECKING
 from uuid import UUID
@@ -55,7 +55,15 @@ T = TypeVar('T')
 
 class PaginatedResponse(BaseModel, Generic[T]):
     data: List[T]
-    total: int
+    total: Optional[int] = Field(
+        default=None,
+        description="Total rows for the user. `None` when requested with `count=none`."
+    )
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Preferred way to page: pass as `cursor` to fetch the next page. "
+                    "`None` when there are no more rows. `skip` is kept for older clients."
+    )
 
 # Resolve forward references after Location is imported
 def _resolve_forward_refs():
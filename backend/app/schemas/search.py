@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+
+class SearchHit(BaseModel):
+    type: Literal["observation", "location"]
+    id: int
+    title: str
+    snippet: Optional[str] = None
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    data: List[SearchHit]
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to fetch the next page. `None` when there are no more hits."
+    )
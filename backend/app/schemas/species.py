@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+
+class SpeciesSuggestion(BaseModel):
+    species: str
+    count: int = Field(description="How many of the user's observations use this name. 0 for reference-list entries.")
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class MonthCount(BaseModel):
+    month: str
+    count: int
+
+
+class SpeciesCount(BaseModel):
+    species: str
+    count: int
+
+
+class CategoryCount(BaseModel):
+    category: str
+    count: int
+
+
+class StatsResponse(BaseModel):
+    year: Optional[int] = None
+    total: int
+    per_month: List[MonthCount]
+    top_species: List[SpeciesCount]
+    per_category: List[CategoryCount]
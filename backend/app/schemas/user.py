@@ -31,3 +31,4 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     user_id: UUID
     email: str
+    exp: Optional[int] = None
@@ -0,0 +1,84 @@
+"""Ranked search over a user's observations and locations.
+
+Matches Postgres full-text search with the Norwegian configuration against
+the generated search_vector columns, plus pg_trgm similarity on the short
+name-like columns so typos such as "rødstrupa" still find "Rødstrupe".
+"""
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import Float, func, literal_column, or_, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Location as LocationModel, Observation as ObservationModel, TaxonomyTerm
+from .pagination import decode_cursor, encode_cursor
+from .taxonomy import TermKind
+
+SEARCH_CONFIG = literal_column("'norwegian'::regconfig")
+HEADLINE_OPTIONS = "MaxFragments=1, MaxWords=20, MinWords=5"
+
+
+def _hits(user_id: UUID, q: str):
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    # Species names are matched once in the small dictionary table, then by id
+    species_vector = func.to_tsvector(SEARCH_CONFIG, TaxonomyTerm.name)
+    matching_species = select(TaxonomyTerm.id).where(
+        TaxonomyTerm.kind == TermKind.species.value,
+        or_(TaxonomyTerm.name.op("%")(q), species_vector.op("@@")(query)),
+    )
+    observations = select(
+        literal_column("'observation'").label("type"),
+        ObservationModel.id,
+        TaxonomyTerm.name.label("title"),
+        ObservationModel.notes.label("body"),
+        (func.ts_rank_cd(species_vector, query) + func.ts_rank_cd(ObservationModel.search_vector, query) + func.similarity(TaxonomyTerm.name, q)).cast(Float).label("rank"),
+    ).join(TaxonomyTerm, TaxonomyTerm.id == ObservationModel.species_id).where(
+        ObservationModel.user_id == user_id,
+        or_(ObservationModel.search_vector.op("@@")(query), ObservationModel.species_id.in_(matching_species)),
+    )
+    locations = select(
+        literal_column("'location'").label("type"),
+        LocationModel.id,
+        LocationModel.name.label("title"),
+        LocationModel.description.label("body"),
+        (func.ts_rank_cd(LocationModel.search_vector, query) + func.greatest(func.similarity(LocationModel.name, q), func.similarity(func.coalesce(LocationModel.address, ""), q))).cast(Float).label("rank"),
+    ).where(
+        LocationModel.user_id == user_id,
+        or_(LocationModel.search_vector.op("@@")(query), LocationModel.name.op("%")(q), LocationModel.address.op("%")(q)),
+    )
+    return union_all(observations, locations).subquery("hits"), query
+
+
+async def search(db: AsyncSession, user_id: UUID, q: str, limit: int, cursor: Optional[str] = None) -> dict:
+    hits, query = _hits(user_id, q)
+    key = tuple_(hits.c.rank, hits.c.type, hits.c.id)
+    ordering = [hits.c.rank.desc(), hits.c.type.desc(), hits.c.id.desc()]
+
+    page = select(hits)
+    if cursor:
+        value, last_id = decode_cursor(cursor, "rank", "desc", hits.c.rank)
+        try:
+            last_rank, last_type = value
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        page = page.where(key < tuple_(last_rank, last_type, last_id))
+    page = page.order_by(*ordering).limit(limit + 1).subquery("page")
+
+    # Headlines are only computed for the rows on this page
+    stmt = select(
+        page.c.type,
+        page.c.id,
+        page.c.title,
+        func.ts_headline(SEARCH_CONFIG, page.c.body, query, HEADLINE_OPTIONS).label("snippet"),
+        page.c.rank,
+    ).order_by(page.c.rank.desc(), page.c.type.desc(), page.c.id.desc())
+    rows = (await db.execute(stmt)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor("rank", "desc", [last.rank, last.type], last.id)
+
+    return {"data": [row._asdict() for row in rows], "next_cursor": next_cursor}
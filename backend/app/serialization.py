@@ -0,0 +1,60 @@
+"""Fast path for list responses: column tuples encoded straight to JSON bytes.
+
+Field order comes from the response schemas, so the output matches what the
+Pydantic models would produce, without hydrating ORM objects or validating
+each row.
+"""
+from typing import Any, Dict, Iterable, Sequence, Set
+from uuid import UUID
+
+import orjson
+
+from .models import Observation as ObservationModel, Location as LocationModel
+from .schemas import Observation, Location, LocationWithCount
+
+# Pydantic writes UTC as "Z"; timestamptz columns come back aware, naive is assumed UTC like the schemas do
+JSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC
+
+OBSERVATION_FIELDS = tuple(name for name in Observation.model_fields if name != "location")
+LOCATION_FIELDS = tuple(Location.model_fields)
+LOCATION_WITH_COUNT_FIELDS = tuple(LocationWithCount.model_fields)
+
+# Names are selected as dictionary ids and resolved through app.taxonomy.term_names
+TERM_COLUMNS = {"species": ObservationModel.species_id, "category": ObservationModel.category_id}
+
+OBSERVATION_COLUMNS = tuple(TERM_COLUMNS[name] if name in TERM_COLUMNS else getattr(ObservationModel, name) for name in OBSERVATION_FIELDS)
+LOCATION_COLUMNS = tuple(getattr(LocationModel, name) for name in LOCATION_FIELDS)
+
+_TERM_POSITIONS = tuple(OBSERVATION_FIELDS.index(name) for name in TERM_COLUMNS)
+_LOCATION_ID = LOCATION_FIELDS.index("id")
+
+
+def _default(value: Any) -> Any:
+    # asyncpg returns its own UUID subclass, which orjson only encodes through default
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def dumps(data: Any) -> bytes:
+    return orjson.dumps(data, default=_default, option=JSON_OPTIONS)
+
+
+def observation_term_ids(rows: Iterable[Sequence]) -> Set[int]:
+    return {row[position] for row in rows for position in _TERM_POSITIONS}
+
+
+def observation_record(row: Sequence, names: Dict[int, str]) -> dict:
+    """Record for a row of OBSERVATION_COLUMNS followed by outer-joined LOCATION_COLUMNS."""
+    split = len(OBSERVATION_FIELDS)
+    record = dict(zip(OBSERVATION_FIELDS, row[:split]))
+    for name in TERM_COLUMNS:
+        record[name] = names[record[name]]
+    location = row[split:]
+    record["location"] = None if location[_LOCATION_ID] is None else dict(zip(LOCATION_FIELDS, location))
+    return record
+
+
+def location_record(row: Sequence) -> dict:
+    """Record for a row of LOCATION_COLUMNS followed by the observation count."""
+    return dict(zip(LOCATION_WITH_COUNT_FIELDS, row))
@@ -0,0 +1,117 @@
+"""In-memory species autocomplete.
+
+Each user's distinct species names live in a sorted array searched with
+bisect. The array is built lazily from the user's observations, patched by the
+observation write routes in this process and evicted by LRU; the TTL bounds
+how long writes made by other workers can go unseen.
+"""
+import heapq
+import logging
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import TTLCache
+from .config import settings
+from .models import Observation as ObservationModel, TaxonomyTerm
+
+logger = logging.getLogger(__name__)
+
+species_indexes = TTLCache("species", settings.species_index_cache_size, settings.species_index_ttl_seconds)
+_reference: Optional["SpeciesIndex"] = None
+
+
+class SpeciesIndex:
+    def __init__(self, counts: Dict[str, int]):
+        self.counts = dict(counts)
+        self.keys = sorted((name.casefold(), name) for name in self.counts)
+
+    def add(self, name: str) -> None:
+        if name in self.counts:
+            self.counts[name] += 1
+        else:
+            self.counts[name] = 1
+            insort(self.keys, (name.casefold(), name))
+
+    def remove(self, name: str) -> None:
+        count = self.counts.get(name)
+        if not count:
+            return
+        if count > 1:
+            self.counts[name] = count - 1
+            return
+        del self.counts[name]
+        key = (name.casefold(), name)
+        index = bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            del self.keys[index]
+
+    def matches(self, prefix: str) -> Iterator[str]:
+        folded = prefix.casefold()
+        index = bisect_left(self.keys, (folded,))
+        while index < len(self.keys) and self.keys[index][0].startswith(folded):
+            yield self.keys[index][1]
+            index += 1
+
+    def suggest(self, prefix: str, limit: int) -> List[str]:
+        # Most used first, then alphabetical
+        return heapq.nsmallest(limit, self.matches(prefix), key=lambda name: (-self.counts[name], name.casefold()))
+
+
+def reference_index() -> SpeciesIndex:
+    global _reference
+    if _reference is None:
+        names: Dict[str, int] = {}
+        if settings.species_reference_file:
+            try:
+                with open(settings.species_reference_file, encoding="utf-8") as f:
+                    names = {line.strip(): 0 for line in f if line.strip()}
+            except OSError as e:
+                logger.warning(f"Could not read species reference list: {e}")
+        _reference = SpeciesIndex(names)
+    return _reference
+
+
+async def get_species_index(db: AsyncSession, user_id: UUID) -> SpeciesIndex:
+    index = species_indexes.get(user_id)
+    if index is None:
+        rows = await db.execute(
+            select(TaxonomyTerm.name, func.count())
+            .join(ObservationModel, ObservationModel.species_id == TaxonomyTerm.id)
+            .where(ObservationModel.user_id == user_id)
+            .group_by(TaxonomyTerm.name)
+        )
+        index = SpeciesIndex(dict(rows.all()))
+        species_indexes.set(user_id, index)
+    return index
+
+
+def record_species(user_id: UUID, added: Iterable[str] = (), removed: Iterable[str] = ()) -> None:
+    # Only patch an index that is already built; a missing one is built fresh on next use
+    index = species_indexes.peek(user_id)
+    if index is None:
+        return
+    for name in removed:
+        index.remove(name)
+    for name in added:
+        index.add(name)
+
+
+def invalidate_species(user_id: UUID) -> None:
+    species_indexes.invalidate(user_id)
+
+
+async def suggest_species(db: AsyncSession, user_id: UUID, prefix: str, limit: int) -> List[dict]:
+    index = await get_species_index(db, user_id)
+    suggestions = [{"species": name, "count": index.counts[name]} for name in index.suggest(prefix, limit)]
+    if len(suggestions) < limit:
+        seen = {suggestion["species"].casefold() for suggestion in suggestions}
+        for name in reference_index().matches(prefix):
+            if name.casefold() not in seen:
+                suggestions.append({"species": name, "count": 0})
+                if len(suggestions) == limit:
+                    break
+    return suggestions
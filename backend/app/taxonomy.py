@@ -0,0 +1,103 @@
+"""Name <-> id lookup for the species/category dictionary.
+
+Terms are never renamed or deleted, so a cached id stays valid for the life
+of the process. Only ids of committed terms are cached by name: a term
+inserted by the current transaction could still be rolled back. Names are
+cached by id unconditionally, since a rolled-back id is never handed out again.
+"""
+from enum import Enum
+from typing import Dict, Iterable, List
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import TTLCache
+from .config import settings
+from .models import Observation as ObservationModel, TaxonomyTerm
+
+term_cache = TTLCache("taxonomy", settings.taxonomy_cache_size, settings.taxonomy_cache_ttl_seconds)
+name_cache = TTLCache("taxonomy_names", settings.taxonomy_cache_size, settings.taxonomy_cache_ttl_seconds)
+
+
+class TermKind(str, Enum):
+    species = "species"
+    category = "category"
+
+
+async def lookup_terms(db: AsyncSession, kind: TermKind, names: Iterable[str]) -> Dict[str, int]:
+    """Ids of existing terms; unknown names are left out."""
+    ids = {}
+    missing = []
+    for name in set(names):
+        term_id = term_cache.get((kind, name))
+        if term_id is None:
+            missing.append(name)
+        else:
+            ids[name] = term_id
+    if missing:
+        rows = await db.execute(select(TaxonomyTerm.name, TaxonomyTerm.id).where(TaxonomyTerm.kind == kind.value, TaxonomyTerm.name.in_(missing)))
+        for name, term_id in rows:
+            term_cache.set((kind, name), term_id)
+            ids[name] = term_id
+    return ids
+
+
+async def resolve_terms(db: AsyncSession, kind: TermKind, names: Iterable[str]) -> Dict[str, int]:
+    """Ids for every name, creating terms that do not exist yet."""
+    names = set(names)
+    ids = await lookup_terms(db, kind, names)
+    missing = names - ids.keys()
+    if missing:
+        await db.execute(
+            insert(TaxonomyTerm)
+            .values([{"kind": kind.value, "name": name} for name in sorted(missing)])
+            .on_conflict_do_nothing(constraint="uq_taxonomy_terms_kind_name")
+        )
+        rows = await db.execute(select(TaxonomyTerm.name, TaxonomyTerm.id).where(TaxonomyTerm.kind == kind.value, TaxonomyTerm.name.in_(missing)))
+        ids.update(dict(rows.all()))
+    return ids
+
+
+async def term_names(db: AsyncSession, ids: Iterable[int]) -> Dict[int, str]:
+    names = {}
+    missing = []
+    for term_id in set(ids):
+        name = name_cache.get(term_id)
+        if name is None:
+            missing.append(term_id)
+        else:
+            names[term_id] = name
+    if missing:
+        rows = await db.execute(select(TaxonomyTerm.id, TaxonomyTerm.name).where(TaxonomyTerm.id.in_(missing)))
+        for term_id, name in rows:
+            name_cache.set(term_id, name)
+            names[term_id] = name
+    return names
+
+
+async def observation_values(db: AsyncSession, items: List[dict]) -> List[dict]:
+    """Replace species/category names in observation dicts with dictionary ids."""
+    species = await resolve_terms(db, TermKind.species, (item["species"] for item in items if "species" in item))
+    categories = await resolve_terms(db, TermKind.category, (item["category"] for item in items if "category" in item))
+    values = []
+    for item in items:
+        item = dict(item)
+        if "species" in item:
+            item["species_id"] = species[item.pop("species")]
+        if "category" in item:
+            item["category_id"] = categories[item.pop("category")]
+        values.append(item)
+    return values
+
+
+def set_term_names(db_observation: ObservationModel, species: str, category: str) -> None:
+    db_observation.species = species
+    db_observation.category = category
+
+
+async def attach_term_names(db: AsyncSession, observations: Iterable[ObservationModel]) -> None:
+    """Set the species/category names that responses read off loaded observations."""
+    observations = list(observations)
+    names = await term_names(db, (term_id for db_observation in observations for term_id in (db_observation.species_id, db_observation.category_id)))
+    for db_observation in observations:
+        set_term_names(db_observation, names[db_observation.species_id], names[db_observation.category_id])
@@ -0,0 +1,69 @@
+from uuid import UUID
+
+from sqlalchemy import func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import TTLCache
+from .config import settings
+from .geo import BBox, bbox_filter, project_to_tile, tile_bbox
+from .models import Location as LocationModel, Observation as ObservationModel, TaxonomyTerm
+from .mvt import EXTENT, encode_layer, encode_tile
+
+# Points this far outside the tile (in tile units) are still included so
+# markers on the edge are not clipped by the renderer
+BUFFER = 64
+
+tile_cache = TTLCache("tiles", settings.tile_cache_size, settings.tile_cache_ttl_seconds)
+
+
+def _buffered_bbox(zoom: int, x: int, y: int) -> BBox:
+    bbox = tile_bbox(zoom, x, y)
+    lon_margin = (bbox.max_lon - bbox.min_lon) * BUFFER / EXTENT
+    lat_margin = (bbox.max_lat - bbox.min_lat) * BUFFER / EXTENT
+    return BBox(
+        max(bbox.min_lon - lon_margin, -180), max(bbox.min_lat - lat_margin, -90),
+        min(bbox.max_lon + lon_margin, 180), min(bbox.max_lat + lat_margin, 90),
+    )
+
+
+async def render_tile(db: AsyncSession, user_id: UUID, zoom: int, x: int, y: int) -> bytes:
+    # Summarized per location in the tile, through the location_id index
+    summary = (
+        select(
+            func.count().label("observation_count"),
+            func.array_agg(TaxonomyTerm.name.distinct()).label("categories"),
+        )
+        .select_from(ObservationModel)
+        .join(TaxonomyTerm, TaxonomyTerm.id == ObservationModel.category_id)
+        .where(ObservationModel.location_id == LocationModel.id, ObservationModel.user_id == user_id)
+        .lateral()
+    )
+    stmt = (
+        select(
+            LocationModel.id,
+            LocationModel.name,
+            LocationModel.latitude,
+            LocationModel.longitude,
+            summary.c.observation_count,
+            summary.c.categories,
+        )
+        .join(summary, true())
+        .where(
+            LocationModel.user_id == user_id,
+            bbox_filter(LocationModel.geohash, LocationModel.latitude, LocationModel.longitude, _buffered_bbox(zoom, x, y)),
+        )
+        .order_by(LocationModel.id)
+    )
+    features = [
+        (
+            row.id,
+            project_to_tile(row.latitude, row.longitude, zoom, x, y, EXTENT),
+            {
+                "name": row.name,
+                "observation_count": row.observation_count,
+                "categories": ",".join(sorted(row.categories)) if row.categories else None,
+            },
+        )
+        for row in await db.execute(stmt)
+    ]
+    return encode_tile([encode_layer("locations", features)])
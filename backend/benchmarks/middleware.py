@@ -0,0 +1,87 @@
+"""Requests/sec through LoggingMiddleware vs. the previous BaseHTTPMiddleware version.
+
+Run from backend/ with the usual environment variables set:
+
+    python -m benchmarks.middleware [requests]
+"""
+import asyncio
+import sys
+import time
+from uuid import uuid4
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.auth import create_access_token, verify_access_token
+from app.logging_context import set_sub, clear_sub, get_sub
+from app.middleware import LoggingMiddleware
+
+
+class BaseHTTPLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        clear_sub()
+
+        auth_header = request.headers.get("authorization")
+        if not auth_header:
+            return await call_next(request)
+
+        try:
+            scheme, credentials = auth_header.split()
+        except ValueError:
+            return await call_next(request)
+
+        if scheme.lower() != "bearer":
+            return await call_next(request)
+
+        try:
+            token_data = verify_access_token(credentials)
+            request.state.token = credentials
+            request.state.token_data = token_data
+            if token_data:
+                set_sub(str(token_data.user_id))
+        except Exception:
+            pass
+
+        return await call_next(request)
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+    if middleware is not None:
+        app.add_middleware(middleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"sub": get_sub()}
+
+    return app
+
+
+async def measure(app: FastAPI, headers: dict, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(100):
+            await client.get("/ping", headers=headers)
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/ping", headers=headers)
+        return requests / (time.perf_counter() - start)
+
+
+async def main(requests: int) -> None:
+    token = create_access_token({"sub": str(uuid4()), "email": "bench@example.com"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    print(f"{'middleware':<24}{'req/s':>10}")
+    for name, middleware in [
+        ("none", None),
+        ("BaseHTTPMiddleware", BaseHTTPLoggingMiddleware),
+        ("pure ASGI", LoggingMiddleware),
+    ]:
+        rate = await measure(build_app(middleware), headers, requests)
+        print(f"{name:<24}{rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,103 @@
+"""Observation list pages: ORM objects + Pydantic vs. column tuples + orjson.
+
+Seeds a throwaway user inside a transaction that is rolled back at the end.
+Run from backend/ against a migrated database with the usual environment
+variables set:
+
+    python -m benchmarks.serialization [iterations]
+"""
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.orm import joinedload
+
+from app.database import SessionLocal
+from app.models import Observation as ObservationModel, Location as LocationModel, User as UserModel
+from app.schemas import Observation, PaginatedResponse
+from app.serialization import LOCATION_COLUMNS, OBSERVATION_COLUMNS, dumps, observation_record, observation_term_ids
+from app.taxonomy import TermKind, attach_term_names, resolve_terms, term_names
+
+PAGE_SIZES = [100, 1000]
+PAGE = TypeAdapter(PaginatedResponse[Observation])
+
+
+async def seed(db, rows: int):
+    user_id = uuid4()
+    await db.execute(insert(UserModel).values(id=user_id, keycloak_id=f"bench-{user_id}", email=f"{user_id}@bench.invalid", name="Bench"))
+    species = await resolve_terms(db, TermKind.species, [f"Benchmeis {i}" for i in range(50)])
+    categories = await resolve_terms(db, TermKind.category, ["Fugl", "Pattedyr"])
+    location_ids = (await db.scalars(insert(LocationModel).returning(LocationModel.id), [
+        {"name": f"Benchlia {i}", "latitude": 60 + i / 100, "longitude": 10 + i / 100, "description": "Skog og myr", "user_id": user_id}
+        for i in range(rows // 10)
+    ])).all()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    await db.execute(insert(ObservationModel), [
+        {
+            "species_id": list(species.values())[i % len(species)],
+            "category_id": list(categories.values())[i % len(categories)],
+            "date": start + timedelta(hours=i),
+            "location_id": location_ids[i % len(location_ids)] if i % 4 else None,
+            "notes": f"Observasjon nummer {i}",
+            "user_id": user_id,
+        }
+        for i in range(rows)
+    ])
+    return user_id
+
+
+async def orm_page(db, user_id, limit: int) -> bytes:
+    # The previous path: hydrate ORM objects, validate with from_attributes, encode the JSON-mode dump
+    query = select(ObservationModel).where(ObservationModel.user_id == user_id).options(joinedload(ObservationModel.location)).order_by(ObservationModel.id.desc()).limit(limit)
+    observations = (await db.scalars(query)).all()
+    await attach_term_names(db, observations)
+    page = PAGE.validate_python({"data": observations, "total": None, "next_cursor": None}, from_attributes=True)
+    content = json.dumps(PAGE.dump_python(page, mode="json"), ensure_ascii=False, separators=(",", ":")).encode()
+    db.expunge_all()
+    return content
+
+
+async def column_page(db, user_id, limit: int) -> bytes:
+    query = select(*OBSERVATION_COLUMNS, *LOCATION_COLUMNS).outerjoin(ObservationModel.location).where(ObservationModel.user_id == user_id).order_by(ObservationModel.id.desc()).limit(limit)
+    rows = (await db.execute(query)).all()
+    names = await term_names(db, observation_term_ids(rows))
+    observations = [observation_record(row, names) for row in rows]
+    return dumps({"data": observations, "total": None, "next_cursor": None})
+
+
+async def measure(page, db, user_id, limit: int, iterations: int):
+    for _ in range(5):
+        await page(db, user_id, limit)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await page(db, user_id, limit)
+    elapsed_ms = (time.perf_counter() - start) / iterations * 1000
+
+    tracemalloc.start()
+    await page(db, user_id, limit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak / 1024
+
+
+async def main(iterations: int) -> None:
+    async with SessionLocal() as db:
+        user_id = await seed(db, max(PAGE_SIZES))
+        assert json.loads(await orm_page(db, user_id, 10)) == json.loads(await column_page(db, user_id, 10)), "Both paths must produce the same page"
+
+        print(f"{'rows':>6}  {'path':<20}{'ms/page':>10}{'peak KiB':>12}")
+        for limit in PAGE_SIZES:
+            for name, page in [("orm + pydantic", orm_page), ("columns + orjson", column_page)]:
+                elapsed_ms, peak_kib = await measure(page, db, user_id, limit, iterations)
+                print(f"{limit:>6}  {name:<20}{elapsed_ms:>10.2f}{peak_kib:>12.0f}")
+        await db.rollback()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
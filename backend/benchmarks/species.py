@@ -0,0 +1,26 @@
+"""Species autocomplete: prefix suggestions from an in-memory SpeciesIndex.
+
+Run from backend/ with the usual environment variables set:
+
+    python -m benchmarks.species [lookups]
+"""
+import sys
+import time
+
+from app.species import SpeciesIndex
+
+SIZES = [1000, 50000]
+
+
+def main(lookups: int) -> None:
+    print(f"{'names':>6}  {'µs/lookup':>10}")
+    for size in SIZES:
+        index = SpeciesIndex({f"Art {i:05d}": i % 7 for i in range(size)})
+        start = time.perf_counter()
+        for _ in range(lookups):
+            index.suggest("Art 123", 10)
+        print(f"{size:>6}  {(time.perf_counter() - start) / lookups * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -1,8 +1,9 @@
 import pytest
+import time
 from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 from jose import jwt, JWTError
-from app.auth import create_access_token, decode_access_token
+from app.auth import create_access_token, decode_access_token, verify_access_token, token_cache
 from app.config import settings
 
 
@@ -225,3 +226,41 @@ class TestJWTValidation:
         token_data = decode_access_token(future_token)
 
         assert token_data is None
+
+
+class TestVerifiedTokenCache:
+    def setup_method(self):
+        token_cache.clear()
+
+    def test_repeated_token_is_served_from_cache(self):
+        user_id = uuid4()
+        token = create_access_token({"sub": str(user_id), "email": "test@example.com"})
+
+        first = verify_access_token(token)
+        hits_before = token_cache.hits
+        second = verify_access_token(token)
+
+        assert first is not None
+        assert second == first
+        assert token_cache.hits == hits_before + 1
+
+    def test_invalid_token_is_not_cached(self):
+        verify_access_token("not.a.valid.token")
+        assert len(token_cache) == 0
+
+    def test_cache_entry_does_not_outlive_token(self):
+        now = datetime.now(timezone.utc)
+        payload = {
+            "sub": str(uuid4()),
+            "email": "test@example.com",
+            "exp": now + timedelta(seconds=2),
+            "iat": now,
+            "nbf": now,
+            "jti": str(uuid4()),
+            "iss": settings.jwt_issuer
+        }
+        token = jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
+
+        assert verify_access_token(token) is not None
+        _, expires_at = next(iter(token_cache._data.values()))
+        assert expires_at <= time.monotonic() + 2
@@ -0,0 +1,98 @@
+import time
+from app.cache import TTLCache, caches
+
+
+class TestTTLCache:
+    def test_get_returns_cached_value_and_counts_hit(self):
+        cache = TTLCache("test-hit", maxsize=10, ttl=60)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 0
+
+    def test_missing_key_counts_miss(self):
+        cache = TTLCache("test-miss", maxsize=10, ttl=60)
+
+        assert cache.get("missing") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_peek_leaves_stats_and_order_alone(self):
+        cache = TTLCache("test-peek", maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        assert cache.peek("a") == 1
+        assert cache.peek("missing") is None
+        assert cache.stats()["hits"] == 0
+        assert cache.stats()["misses"] == 0
+
+        cache.set("c", 3)
+        assert cache.peek("a") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache("test-lru", maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_entries_expire_after_ttl(self):
+        cache = TTLCache("test-ttl", maxsize=10, ttl=60)
+        cache.set("a", 1, ttl=0.01)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_invalidate_removes_entry(self):
+        cache = TTLCache("test-invalidate", maxsize=10, ttl=60)
+        cache.set("a", 1)
+        cache.invalidate("a")
+
+        assert cache.get("a") is None
+
+    def test_cache_is_registered_by_name(self):
+        cache = TTLCache("test-registry", maxsize=10, ttl=60)
+        assert caches["test-registry"] is cache
+
+
+class TestTTLCacheByteBound:
+    def test_evicts_least_recently_used_until_bytes_fit(self):
+        cache = TTLCache("test-bytes", maxsize=10, ttl=60, maxbytes=10)
+        cache.set("a", b"1234")
+        cache.set("b", b"1234")
+        cache.get("a")
+        cache.set("c", b"1234")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1234"
+        assert cache.stats()["bytes"] == 8
+
+    def test_replacing_entry_updates_bytes(self):
+        cache = TTLCache("test-bytes-replace", maxsize=10, ttl=60, maxbytes=10)
+        cache.set("a", b"1234")
+        cache.set("a", b"12")
+
+        assert cache.stats()["bytes"] == 2
+
+    def test_value_larger_than_bound_is_not_cached(self):
+        cache = TTLCache("test-bytes-oversized", maxsize=10, ttl=60, maxbytes=4)
+        cache.set("a", b"12")
+        cache.set("b", b"12345")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"12"
+
+    def test_expired_entry_releases_bytes(self):
+        cache = TTLCache("test-bytes-ttl", maxsize=10, ttl=60, maxbytes=10)
+        cache.set("a", b"1234", ttl=0.01)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] == 0
@@ -0,0 +1,83 @@
+import pytest
+from fastapi import HTTPException
+from app.geo import BBox, radius_bbox, cell_size, cover_bbox, encode_geohash, lat_to_tile_y, location_geohash, lon_to_tile_x, parse_bbox, tile_bbox, tiles_for_bbox
+
+
+class TestEncodeGeohash:
+    def test_known_value(self):
+        assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+    def test_prefix_is_coarser_cell(self):
+        assert encode_geohash(59.91, 10.75, 12).startswith(encode_geohash(59.91, 10.75, 5))
+
+    def test_missing_coordinate(self):
+        assert location_geohash(None, 10.75) is None
+        assert location_geohash(59.91, None) is None
+
+
+class TestCoverBBox:
+    def test_cover_contains_points_inside(self):
+        bbox = BBox(10.6, 59.8, 10.9, 60.0)
+        prefixes = cover_bbox(bbox)
+
+        for lat, lon in [(59.8, 10.6), (60.0, 10.9), (59.91, 10.75)]:
+            geohash = encode_geohash(lat, lon)
+            assert any(geohash.startswith(prefix) for prefix in prefixes)
+
+    def test_cover_respects_cell_limit(self):
+        assert len(cover_bbox(BBox(4.0, 57.0, 31.0, 71.0), max_cells=16)) <= 16
+
+    def test_small_bbox_uses_fine_cells(self):
+        prefixes = cover_bbox(BBox(10.75, 59.91, 10.751, 59.911))
+
+        width, height = cell_size(len(prefixes[0]))
+        assert width < 0.1 and height < 0.1
+
+    def test_whole_world(self):
+        assert cover_bbox(BBox(-180, -90, 180, 90)) == []
+
+
+class TestParseBBox:
+    def test_valid(self):
+        assert parse_bbox("10.6,59.8,10.9,60.0") == BBox(10.6, 59.8, 10.9, 60.0)
+
+    @pytest.mark.parametrize("value", ["10,59,11", "a,b,c,d", "11,59,10,60", "10,-91,11,60"])
+    def test_invalid(self, value):
+        with pytest.raises(HTTPException) as exc:
+            parse_bbox(value)
+        assert exc.value.status_code == 400
+
+
+class TestTiles:
+    def test_known_tile(self):
+        # Oslo at zoom 10
+        assert (lon_to_tile_x(10.75, 10), lat_to_tile_y(59.91, 10)) == (542, 297)
+
+    def test_tile_bbox_contains_its_points(self):
+        bbox = tile_bbox(10, 542, 297)
+
+        assert bbox.min_lon <= 10.75 <= bbox.max_lon
+        assert bbox.min_lat <= 59.91 <= bbox.max_lat
+
+    def test_world_is_one_tile_at_zoom_zero(self):
+        assert tiles_for_bbox(BBox(-180, -90, 180, 90), 0) == [(0, 0)]
+
+    def test_tiles_for_bbox(self):
+        tiles = tiles_for_bbox(tile_bbox(5, 16, 9)._replace(max_lon=tile_bbox(5, 17, 9).max_lon - 0.1), 5)
+
+        assert set(tiles) >= {(16, 9), (17, 9)}
+
+
+class TestRadiusBBox:
+    def test_contains_circle(self):
+        bbox = radius_bbox(59.91, 10.75, 1000)
+
+        # 1 km is roughly 0.009 degrees of latitude and 0.018 degrees of longitude at 60N
+        assert bbox.min_lat < 59.902 and bbox.max_lat > 59.918
+        assert bbox.min_lon < 10.733 and bbox.max_lon > 10.767
+
+    def test_clamped_near_pole(self):
+        bbox = radius_bbox(89.99, 0, 5000)
+
+        assert bbox.max_lat == 90
+        assert (bbox.min_lon, bbox.max_lon) == (-180, 180)
@@ -0,0 +1,73 @@
+import asyncio
+import io
+import json
+import pytest
+from app.importer import STAGING, YIELD_EVERY, ImportFormatError, ImportKind, ImportReport, feature_to_row, iter_csv_rows, iter_geojson_features, iter_records
+
+
+def feature_collection(count):
+    return json.dumps({
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [10.0 + i, 59.0]}, "properties": {"name": f"Sted {i}"}}
+            for i in range(count)
+        ],
+    })
+
+
+class TestGeoJSONStreaming:
+    def test_yields_every_feature_across_small_chunks(self):
+        features = list(iter_geojson_features(io.StringIO(feature_collection(50)), chunk_size=16))
+
+        assert len(features) == 50
+        assert features[49]["properties"]["name"] == "Sted 49"
+
+    def test_empty_feature_collection(self):
+        assert list(iter_geojson_features(io.StringIO('{"type": "FeatureCollection", "features": []}'))) == []
+
+    def test_truncated_document_is_rejected(self):
+        with pytest.raises(ImportFormatError):
+            list(iter_geojson_features(io.StringIO(feature_collection(3)[:-20]), chunk_size=16))
+
+    def test_missing_features_array_is_rejected(self):
+        with pytest.raises(ImportFormatError):
+            list(iter_geojson_features(io.StringIO('{"type": "Feature"}')))
+
+    def test_point_geometry_fills_location_coordinates(self):
+        feature = {"geometry": {"type": "Point", "coordinates": [10.75, 59.91]}, "properties": {"name": "Oslo"}}
+
+        row = feature_to_row(ImportKind.locations, feature)
+
+        assert row == {"name": "Oslo", "longitude": 10.75, "latitude": 59.91}
+
+
+class TestCSVRows:
+    def test_empty_cells_become_none(self):
+        rows = list(iter_csv_rows(io.StringIO("species,notes,category\nRødstrupe,,Fugl\n")))
+        assert rows == [{"species": "Rødstrupe", "notes": None, "category": "Fugl"}]
+
+
+class TestRecords:
+    def test_yields_to_the_event_loop_while_validating(self):
+        staging = STAGING[ImportKind.locations]
+        rows = [{"name": f"Sted {i}", "latitude": 59.0, "longitude": 10.0} if i % 2 else {"name": None} for i in range(YIELD_EVERY * 5)]
+        report = ImportReport(max_errors=10)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        async def collect():
+            task = asyncio.create_task(ticker())
+            records = [record async for record in iter_records(staging["schema"], staging["columns"], staging["derived"], iter(rows), report)]
+            task.cancel()
+            return records
+
+        records = asyncio.run(collect())
+
+        assert len(records) == YIELD_EVERY * 5 // 2
+        assert report.rejected == YIELD_EVERY * 5 // 2
+        assert ticks >= 5
@@ -0,0 +1,21 @@
+from app.metrics import Counter, Histogram
+
+
+class TestHistogram:
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram("test_seconds", "Test.", (0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value, route="/x")
+
+        lines = list(histogram.render())
+
+        assert 'test_seconds_bucket{route="/x",le="0.1"} 2' in lines
+        assert 'test_seconds_bucket{route="/x",le="1.0"} 3' in lines
+        assert 'test_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+        assert 'test_seconds_count{route="/x"} 4' in lines
+
+    def test_labels_are_escaped(self):
+        counter = Counter("test_total", "Test.")
+        counter.inc(route='/a"b')
+
+        assert 'test_total{route="/a\\"b"} 1' in list(counter.render())
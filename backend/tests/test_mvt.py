@@ -0,0 +1,90 @@
+import struct
+from app.etag import etag_matches
+from app.mvt import encode_layer, encode_tile, _zigzag
+
+
+def read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return result, pos
+
+
+def read_message(data):
+    """Decode a protobuf message into {field: [values]} without a schema."""
+    fields = {}
+    pos = 0
+    while pos < len(data):
+        key, pos = read_varint(data, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = read_varint(data, pos)
+        elif wire_type == 1:
+            value = struct.unpack("<d", data[pos:pos + 8])[0]
+            pos += 8
+        else:
+            length, pos = read_varint(data, pos)
+            value = data[pos:pos + length]
+            pos += length
+        fields.setdefault(field, []).append(value)
+    return fields
+
+
+def read_packed(data):
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+class TestEncodeLayer:
+    def test_layer_structure(self):
+        tile = encode_tile([encode_layer("locations", [
+            (7, (100, 200), {"name": "Østmarka", "observation_count": 3}),
+            (8, (-5, 4100), {"name": "Nordmarka", "observation_count": 3, "categories": None}),
+        ])])
+
+        layer = read_message(read_message(tile)[3][0])
+        assert layer[15] == [2]
+        assert layer[1] == [b"locations"]
+        assert layer[5] == [4096]
+        assert layer[3] == [b"name", b"observation_count"]
+        values = [read_message(value) for value in layer[4]]
+        assert values == [{1: ["Østmarka".encode()]}, {5: [3]}, {1: [b"Nordmarka"]}]
+
+    def test_feature_geometry_and_tags(self):
+        tile = encode_tile([encode_layer("locations", [(8, (-5, 4100), {"name": "Nordmarka"})])])
+
+        feature = read_message(read_message(read_message(tile)[3][0])[2][0])
+        assert feature[1] == [8]
+        assert feature[3] == [1]
+        assert read_packed(feature[2][0]) == [0, 0]
+        assert read_packed(feature[4][0]) == [9, _zigzag(-5), _zigzag(4100)]
+
+    def test_shared_values_are_deduplicated(self):
+        tile = encode_tile([encode_layer("locations", [
+            (1, (0, 0), {"observation_count": 2}),
+            (2, (1, 1), {"observation_count": 2}),
+        ])])
+
+        layer = read_message(read_message(tile)[3][0])
+        assert len(layer[4]) == 1
+
+
+class TestEtagMatches:
+    def test_exact_and_list(self):
+        assert etag_matches('"a-1"', '"a-1"')
+        assert etag_matches('"x", "a-1"', '"a-1"')
+
+    def test_weak_and_wildcard(self):
+        assert etag_matches('W/"a-1"', '"a-1"')
+        assert etag_matches("*", '"a-1"')
+
+    def test_mismatch(self):
+        assert not etag_matches('"a-2"', '"a-1"')
+        assert not etag_matches(None, '"a-1"')
@@ -0,0 +1,73 @@
+import pytest
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from app.models import Observation as ObservationModel, Location as LocationModel, TaxonomyTerm
+from app.pagination import encode_cursor, decode_cursor, keyset_filter
+
+
+class TestCursorEncoding:
+    def test_roundtrip_string_value(self):
+        cursor = encode_cursor("name", "asc", "Rødstrupe", 42)
+
+        value, last_id = decode_cursor(cursor, "name", "asc", LocationModel.name)
+
+        assert value == "Rødstrupe"
+        assert last_id == 42
+
+    def test_roundtrip_datetime_value(self):
+        date = datetime(2024, 5, 17, 12, 30, tzinfo=timezone.utc)
+        cursor = encode_cursor("date", "desc", date, 7)
+
+        value, last_id = decode_cursor(cursor, "date", "desc", ObservationModel.date)
+
+        assert value == date
+        assert last_id == 7
+
+    def test_roundtrip_null_value(self):
+        cursor = encode_cursor("address", "asc", None, 3)
+
+        value, last_id = decode_cursor(cursor, "address", "asc", LocationModel.address)
+
+        assert value is None
+        assert last_id == 3
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor("name", "asc", "??>>", 1)
+        assert all(c.isalnum() or c in "-_" for c in cursor)
+
+    def test_reject_cursor_for_different_sort(self):
+        cursor = encode_cursor("name", "asc", "Ørn", 1)
+
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(cursor, "name", "desc", LocationModel.name)
+        assert exc.value.status_code == 400
+
+    def test_reject_value_of_wrong_type(self):
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(encode_cursor("id", "asc", "Ørn", 1), "id", "asc", ObservationModel.id)
+        assert exc.value.status_code == 400
+
+        # e.g. a species cursor issued while species sorted by term id
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(encode_cursor("species", "asc", 7, 1), "species", "asc", TaxonomyTerm.name)
+        assert exc.value.status_code == 400
+
+    def test_reject_malformed_cursor(self):
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor("not-a-cursor", "id", "desc", ObservationModel.id)
+        assert exc.value.status_code == 400
+
+
+class TestKeysetFilter:
+    def test_id_sort_uses_single_column(self):
+        clause = str(keyset_filter(ObservationModel.id, ObservationModel.id, True, 10, 10))
+        assert clause == "observations.id < :id_1"
+
+    def test_nullable_ascending_includes_trailing_nulls(self):
+        clause = str(keyset_filter(LocationModel.address, LocationModel.id, False, "A", 5))
+        assert "IS NULL" in clause
+
+    def test_non_nullable_descending_is_row_comparison(self):
+        clause = str(keyset_filter(ObservationModel.date, ObservationModel.id, True, datetime.now(timezone.utc), 5))
+        assert "IS NULL" not in clause
+        assert "(observations.date, observations.id) <" in clause
@@ -0,0 +1,35 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.config import settings
+from app.pool import instrument_pool, pool_snapshot
+
+
+class TestPoolInstrumentation:
+    def test_events_count_checkouts_connects_and_hold_time(self):
+        engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=1)
+        instrument_pool(engine.pool)
+        before = pool_snapshot(engine.pool)
+
+        with engine.connect() as first, engine.connect() as second:
+            first.execute(text("SELECT 1"))
+            second.execute(text("SELECT 1"))
+            during = pool_snapshot(engine.pool)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        after = pool_snapshot(engine.pool)
+        engine.dispose()
+
+        assert during["checked_out"] == 2
+        assert during["overflow"] == 1
+        assert after["checked_out"] == 0
+        assert after["checkouts"] - before["checkouts"] == 3
+        # The overflow connection is closed on checkin, so the third checkout reuses the base one
+        assert after["connects"] - before["connects"] == 2
+        assert after["hold_seconds_total"] > before["hold_seconds_total"]
+
+    def test_max_overflow_comes_from_settings(self):
+        engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=settings.db_max_overflow)
+
+        assert pool_snapshot(engine.pool)["max_overflow"] == settings.db_max_overflow
+        assert pool_snapshot(engine.pool)["overflow"] == 0
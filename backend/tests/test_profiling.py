@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.logging_context import set_sub
+from app.profiling import QueryProfile, SqlProfilerMiddleware, profile_context, profile_engine
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    profile_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+def run_request(engine, statements, sub=None):
+    messages = []
+
+    async def endpoint(scope, receive, send):
+        scope["route"] = SimpleNamespace(path="/api/v1/observations/{observation_id}")
+        with engine.connect() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        messages.append(message)
+
+    async def request():
+        # LoggingMiddleware sets the sub before the profiler runs
+        set_sub(sub)
+        await SqlProfilerMiddleware(endpoint)({"type": "http", "method": "GET", "path": "/api/v1/observations/1"}, None, send)
+
+    asyncio.run(request())
+    return messages
+
+
+class TestQueryProfile:
+    def test_counts_statements_per_request(self, engine):
+        profile = QueryProfile()
+        token = profile_context.set(profile)
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+        finally:
+            profile_context.reset(token)
+
+        assert profile.count == 3
+        assert profile.statements["SELECT 1"] == 2
+        assert profile.total_seconds > 0
+
+
+class TestSqlProfilerMiddleware:
+    def test_attributes_profile_to_route_and_sub(self, engine, caplog):
+        with caplog.at_level(logging.INFO, logger="app.profiling"):
+            run_request(engine, ["SELECT 1", "SELECT 2"], sub="user-1")
+
+        [record] = [record for record in caplog.records if record.name == "app.profiling"]
+        assert record.route == "/api/v1/observations/{observation_id}"
+        assert record.sub == "user-1"
+        assert "2 queries" in record.getMessage()
+
+    def test_warns_about_repeated_statements(self, engine, caplog, monkeypatch):
+        monkeypatch.setattr(settings, "sql_repeat_warning_threshold", 3)
+        with caplog.at_level(logging.INFO, logger="app.profiling"):
+            run_request(engine, ["SELECT 1"] * 3)
+
+        warnings = [record for record in caplog.records if record.levelno == logging.WARNING]
+        assert len(warnings) == 1
+        assert "ran 3 times" in warnings[0].getMessage()
+        assert warnings[0].sub == "-"
+
+    def test_debug_adds_query_count_header(self, engine, monkeypatch):
+        monkeypatch.setattr(settings, "debug", True)
+        messages = run_request(engine, ["SELECT 1", "SELECT 2"])
+
+        headers = dict(messages[0]["headers"])
+        assert headers[b"x-query-count"] == b"2"
+        assert b"x-query-time-ms" in headers
+
+
+class TestSlowQueryLog:
+    def test_parameters_are_redacted(self, engine, caplog, monkeypatch):
+        monkeypatch.setattr(settings, "slow_query_threshold_ms", 0)
+        with caplog.at_level(logging.WARNING, logger="app.sql.slow"):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT :email, :token"), {"email": "ola@example.com", "token": "hemmelig"})
+
+        [record] = caplog.records
+        message = record.getMessage()
+        assert "params=<2 redacted>" in message
+        assert "ola@example.com" not in message
+        assert "hemmelig" not in message
+
+    def test_fast_queries_are_not_logged(self, engine, caplog, monkeypatch):
+        monkeypatch.setattr(settings, "slow_query_threshold_ms", 10_000)
+        with caplog.at_level(logging.WARNING, logger="app.sql.slow"):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        assert caplog.records == []
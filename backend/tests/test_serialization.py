@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from pydantic import TypeAdapter
+
+from app.schemas import Observation, LocationWithCount
+from app.serialization import dumps, observation_record, observation_term_ids, location_record
+
+USER_ID = uuid4()
+CREATED = datetime(2024, 5, 1, 6, 30, tzinfo=timezone.utc)
+UPDATED = datetime(2024, 5, 2, 18, 15, 0, 250000, tzinfo=timezone(timedelta(hours=2)))
+
+
+class UUIDSubclass(UUID):
+    """Stands in for asyncpg's UUID type."""
+
+
+NAMES = {3: "Rødstrupe", 5: "Fugl"}
+
+
+def observation_row(location: bool) -> tuple:
+    observation = (3, CREATED, 7 if location else None, 'Sang "fra" hekken', 5, 42, UUIDSubclass(str(USER_ID)), CREATED, UPDATED)
+    if not location:
+        return observation + (None,) * 9
+    return observation + ("Østmarka", 59.91, 10.75, None, "Sti 1", 7, USER_ID, CREATED, UPDATED)
+
+
+class TestFastSerialization:
+    def test_observation_matches_pydantic_output(self):
+        adapter = TypeAdapter(Observation)
+        for location in (True, False):
+            record = observation_record(observation_row(location), NAMES)
+
+            assert dumps(record) == adapter.dump_json(adapter.validate_python(record))
+
+    def test_observation_without_location_has_null_location(self):
+        assert observation_record(observation_row(False), NAMES)["location"] is None
+
+    def test_observation_names_come_from_term_ids(self):
+        record = observation_record(observation_row(True), NAMES)
+
+        assert (record["species"], record["category"]) == ("Rødstrupe", "Fugl")
+        assert observation_term_ids([observation_row(True)]) == {3, 5}
+
+    def test_location_matches_pydantic_output(self):
+        adapter = TypeAdapter(LocationWithCount)
+        record = location_record(("Østmarka", None, None, "Skog", None, 7, USER_ID, CREATED, UPDATED, 3))
+
+        assert dumps(record) == adapter.dump_json(adapter.validate_python(record))
+
+    def test_naive_datetime_is_treated_as_utc(self):
+        assert dumps({"date": datetime(2024, 5, 1, 6, 30)}) == b'{"date":"2024-05-01T06:30:00Z"}'
@@ -0,0 +1,28 @@
+from app.species import SpeciesIndex
+
+
+class TestSpeciesIndex:
+    def test_prefix_is_case_insensitive(self):
+        index = SpeciesIndex({"Rødstrupe": 3, "Rødvingetrost": 1, "Kjøttmeis": 5})
+
+        assert set(index.matches("rød")) == {"Rødstrupe", "Rødvingetrost"}
+        assert list(index.matches("Ø")) == []
+
+    def test_suggest_orders_by_count_then_name(self):
+        index = SpeciesIndex({"Blåmeis": 2, "Blåstrupe": 7, "Blåbær": 2})
+
+        assert index.suggest("blå", 10) == ["Blåstrupe", "Blåbær", "Blåmeis"]
+        assert index.suggest("blå", 1) == ["Blåstrupe"]
+
+    def test_add_and_remove_keep_counts(self):
+        index = SpeciesIndex({"Gråspurv": 1})
+
+        index.add("Gråspurv")
+        index.add("Gråtrost")
+        index.remove("Gråspurv")
+        assert set(index.matches("grå")) == {"Gråspurv", "Gråtrost"}
+
+        index.remove("Gråspurv")
+        index.remove("Gråspurv")
+        assert list(index.matches("grå")) == ["Gråtrost"]
+
@@ -27,6 +27,7 @@ export interface LocationWithCount extends Location {
 export interface PaginatedResponse<T> {
   data: T[]
   total: number
+  next_cursor?: string | null
 }
 
 export interface User {
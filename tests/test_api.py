@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 import requests
+import json
 import time
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 API_URL = os.getenv("API_URL", "http://localhost:8000")
@@ -179,6 +181,15 @@ def test_delete_location(location_id):
     assert response.status_code == 404, "Location should not exist after deletion"
     print(f"✓ Deleted location ID: {location_id}")
 
+    # Concurrent deletes of one location must decrement the count once
+    location_id = requests.post(f"{API_URL}/api/v1/locations", json={"name": "Slettemyra", "latitude": 60.0, "longitude": 10.0}, headers=HEADERS).json()["id"]
+    total = requests.get(f"{API_URL}/api/v1/locations", headers=HEADERS).json()["total"]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        statuses = list(pool.map(lambda _: requests.delete(f"{API_URL}/api/v1/locations/{location_id}", headers=HEADERS).status_code, range(4)))
+    assert sorted(statuses) == [204, 404, 404, 404], f"Exactly one delete should succeed: {statuses}"
+    assert requests.get(f"{API_URL}/api/v1/locations", headers=HEADERS).json()["total"] == total - 1
+    print("✓ Concurrent location deletes counted once")
+
 def test_observation_count_on_location():
     print("\n--- Testing Observation Count on Location ---")
 
@@ -359,6 +370,481 @@ def test_location_sorting():
     for loc_id in created_ids:
         requests.delete(f"{API_URL}/api/v1/locations/{loc_id}", headers=HEADERS)
 
+def test_cursor_pagination():
+    print("\n--- Testing Cursor Pagination ---")
+
+    created_ids = []
+    for i in range(5):
+        obs = {"species": f"Cursor Bird {i}", "date": f"2024-04-0{i + 1}", "category": "Fugl"}
+        response = requests.post(f"{API_URL}/api/v1/observations", json=obs, headers=HEADERS)
+        assert response.status_code == 201
+        created_ids.append(response.json()["id"])
+
+    params = {"limit": 2, "sort_by": "date", "sort_order": "asc"}
+    response = requests.get(f"{API_URL}/api/v1/observations", params=params, headers=HEADERS)
+    assert response.status_code == 200
+    page = response.json()
+    seen = [obs["id"] for obs in page["data"]]
+    assert page["next_cursor"] is not None, "First page should return next_cursor"
+
+    while page["next_cursor"]:
+        response = requests.get(f"{API_URL}/api/v1/observations", params={**params, "cursor": page["next_cursor"]}, headers=HEADERS)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["data"]) <= 2
+        seen.extend(obs["id"] for obs in page["data"])
+
+    assert len(seen) == len(set(seen)), "Cursor pages should not overlap"
+    assert set(created_ids) <= set(seen), "Cursor pages should cover all rows"
+    offset_ids = [obs["id"] for obs in requests.get(f"{API_URL}/api/v1/observations", params={"limit": 1000, "sort_by": "date", "sort_order": "asc"}, headers=HEADERS).json()["data"]]
+    assert seen == offset_ids, "Cursor pages should match skip-based ordering"
+    print(f"✓ Walked {len(seen)} observations with cursor pagination")
+
+    response = requests.get(f"{API_URL}/api/v1/observations", params={"cursor": "garbage"}, headers=HEADERS)
+    assert response.status_code == 400, "Invalid cursor should be rejected"
+    print("✓ Invalid cursor rejected")
+
+    for obs_id in created_ids:
+        requests.delete(f"{API_URL}/api/v1/observations/{obs_id}", headers=HEADERS)
+
+def test_count_modes():
+    print("\n--- Testing Count Modes ---")
+
+    exact = requests.get(f"{API_URL}/api/v1/observations", params={"count": "exact"}, headers=HEADERS).json()["total"]
+    estimated = requests.get(f"{API_URL}/api/v1/observations", params={"count": "estimated"}, headers=HEADERS).json()["total"]
+    assert exact == estimated, f"Counter total {estimated} should match COUNT(*) {exact}"
+    print(f"✓ Counter total matches exact count ({exact})")
+
+    obs = {"species": "Count Mode Bird", "date": datetime.now().isoformat(), "category": "Fugl"}
+    response = requests.post(f"{API_URL}/api/v1/observations", json=obs, headers=HEADERS)
+    assert response.status_code == 201
+    obs_id = response.json()["id"]
+    response = requests.get(f"{API_URL}/api/v1/observations", headers=HEADERS)
+    assert response.json()["total"] == exact + 1, "Counter should increase after create"
+
+    requests.delete(f"{API_URL}/api/v1/observations/{obs_id}", headers=HEADERS)
+    response = requests.get(f"{API_URL}/api/v1/observations", headers=HEADERS)
+    assert response.json()["total"] == exact, "Counter should decrease after delete"
+    print("✓ Counter follows create and delete")
+
+    response = requests.get(f"{API_URL}/api/v1/locations", params={"count": "none"}, headers=HEADERS)
+    assert response.status_code == 200
+    assert response.json()["total"] is None, "count=none should skip total"
+    print("✓ count=none skips the total")
+
+def test_batch_create():
+    print("\n--- Testing Batch Create ---")
+
+    locations = [{"name": "Batch Location 1"}, {"latitude": 60.0}, {"name": "Batch Location 2"}]
+    response = requests.post(f"{API_URL}/api/v1/locations/batch", json=locations, headers=HEADERS)
+    assert response.status_code == 201, f"Batch create failed: {response.status_code} - {response.text}"
+    data = response.json()
+    assert [loc["name"] for loc in data["data"]] == ["Batch Location 1", "Batch Location 2"]
+    assert [error["index"] for error in data["errors"]] == [1], "Invalid location should be reported by index"
+    location_ids = [loc["id"] for loc in data["data"]]
+    print("✓ Batch created locations and reported invalid item")
+
+    observations = [
+        {"species": "Batch Bird 1", "date": "2024-05-01", "category": "Fugl", "location_id": location_ids[0]},
+        {"species": "Batch Bird 2", "date": "2024-05-02", "category": "Fugl", "location_id": 999999999},
+        {"species": "Batch Bird 3", "category": "Fugl"},
+        {"species": "Batch Bird 4", "date": "2024-05-04", "category": "Fugl"},
+    ]
+    response = requests.post(f"{API_URL}/api/v1/observations/batch", json=observations, headers=HEADERS)
+    assert response.status_code == 201, f"Batch create failed: {response.status_code} - {response.text}"
+    data = response.json()
+    assert [obs["species"] for obs in data["data"]] == ["Batch Bird 1", "Batch Bird 4"]
+    assert data["data"][0]["location"]["id"] == location_ids[0], "Created observation should include its location"
+    assert [error["index"] for error in data["errors"]] == [1, 2], "Unknown location and invalid item should be reported"
+    print("✓ Batch created observations and reported per-item errors")
+
+    for obs in data["data"]:
+        requests.delete(f"{API_URL}/api/v1/observations/{obs['id']}", headers=HEADERS)
+    for loc_id in location_ids:
+        requests.delete(f"{API_URL}/api/v1/locations/{loc_id}", headers=HEADERS)
+
+def test_bulk_import():
+    print("\n--- Testing Bulk Import ---")
+
+    geojson = {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [10.75, 59.91]}, "properties": {"name": "Import Location"}},
+        ]
+    }
+    files = {"file": ("locations.geojson", json.dumps(geojson), "application/geo+json")}
+    response = requests.post(f"{API_URL}/api/v1/imports/locations", params={"format": "geojson"}, files=files, headers=HEADERS)
+    assert response.status_code == 201, f"Location import failed: {response.status_code} - {response.text}"
+    assert response.json()["imported"] == 1
+    print("✓ Imported locations from GeoJSON")
+
+    csv_body = "species,date,notes,category\n" + "".join(f"Import Bird {i},2024-06-01,,Fugl\n" for i in range(100)) + "Bad Row,not-a-date,,Fugl\n"
+    files = {"file": ("observations.csv", csv_body, "text/csv")}
+    response = requests.post(f"{API_URL}/api/v1/imports/observations", files=files, headers=HEADERS)
+    assert response.status_code == 201, f"Observation import failed: {response.status_code} - {response.text}"
+    report = response.json()
+    assert report["received"] == 101
+    assert report["imported"] == 100
+    assert [error["index"] for error in report["errors"]] == [100], "Invalid row should be reported by index"
+    print("✓ Imported observations from CSV and reported invalid row")
+
+    observations = requests.get(f"{API_URL}/api/v1/observations", params={"limit": 1000}, headers=HEADERS).json()["data"]
+    for obs in observations:
+        if obs["species"].startswith("Import Bird"):
+            requests.delete(f"{API_URL}/api/v1/observations/{obs['id']}", headers=HEADERS)
+    locations = requests.get(f"{API_URL}/api/v1/locations", params={"limit": 1000}, headers=HEADERS).json()["data"]
+    for loc in locations:
+        if loc["name"] == "Import Location":
+            requests.delete(f"{API_URL}/api/v1/locations/{loc['id']}", headers=HEADERS)
+
+def test_export_observations():
+    print("\n--- Testing Observation Export ---")
+
+    response = requests.post(f"{API_URL}/api/v1/locations", json={"name": "Export Location", "latitude": 59.9, "longitude": 10.7}, headers=HEADERS)
+    location_id = response.json()["id"]
+    response = requests.post(f"{API_URL}/api/v1/observations", json={"species": "Export Bird", "date": "2024-07-01", "category": "Fugl", "location_id": location_id}, headers=HEADERS)
+    obs_id = response.json()["id"]
+    total = requests.get(f"{API_URL}/api/v1/observations", params={"count": "exact"}, headers=HEADERS).json()["total"]
+
+    response = requests.get(f"{API_URL}/api/v1/observations/export", params={"format": "ndjson"}, headers=HEADERS)
+    assert response.status_code == 200, f"NDJSON export failed: {response.status_code}"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == total
+    exported = next(record for record in records if record["id"] == obs_id)
+    assert exported["location"]["latitude"] == 59.9, "Export should include location coordinates"
+    print(f"✓ Exported {len(records)} observations as NDJSON")
+
+    response = requests.get(f"{API_URL}/api/v1/observations/export", params={"format": "csv"}, headers=HEADERS)
+    assert response.status_code == 200
+    assert response.text.splitlines()[0].startswith("id,species,category,date")
+    print("✓ Exported observations as CSV")
+
+    response = requests.get(f"{API_URL}/api/v1/observations/export", params={"format": "geojson"}, headers=HEADERS)
+    assert response.status_code == 200
+    collection = response.json()
+    feature = next(feature for feature in collection["features"] if feature["id"] == obs_id)
+    assert feature["geometry"]["coordinates"] == [10.7, 59.9]
+    print("✓ Exported observations as GeoJSON")
+
+    requests.delete(f"{API_URL}/api/v1/observations/{obs_id}", headers=HEADERS)
+    requests.delete(f"{API_URL}/api/v1/locations/{location_id}", headers=HEADERS)
+
+def test_bbox_filter():
+    print("\n--- Testing Bounding Box Filter ---")
+
+    inside = requests.post(f"{API_URL}/api/v1/locations", json={"name": "Bbox Inside", "latitude": 69.65, "longitude": 18.96}, headers=HEADERS).json()["id"]
+    outside = requests.post(f"{API_URL}/api/v1/locations", json={"name": "Bbox Outside", "latitude": 58.15, "longitude": 7.99}, headers=HEADERS).json()["id"]
+    obs_id = requests.post(f"{API_URL}/api/v1/observations", json={"species": "Bbox Bird", "date": "2024-07-01", "category": "Fugl", "location_id": inside}, headers=HEADERS).json()["id"]
+    bbox = "18.5,69.5,19.5,69.8"
+
+    response = requests.get(f"{API_URL}/api/v1/locations", params={"bbox": bbox}, headers=HEADERS)
+    assert response.status_code == 200
+    ids = [loc["id"] for loc in response.json()["data"]]
+    assert inside in ids and outside not in ids, "bbox should only return locations inside the box"
+    assert response.json()["total"] == len(ids), "Filtered total should count only matching rows"
+    print(f"✓ Location bbox filter returned {len(ids)} locations")
+
+    response = requests.get(f"{API_URL}/api/v1/observations", params={"bbox": bbox}, headers=HEADERS)
+    assert response.status_code == 200
+    assert [obs["id"] for obs in response.json()["data"]] == [obs_id]
+    print("✓ Observation bbox filter returned observations at matching locations")
+
+    # Moving a location out of the box must update its geohash
+    requests.put(f"{API_URL}/api/v1/locations/{inside}", json={"latitude": 63.43, "longitude": 10.39}, headers=HEADERS)
+    ids = [loc["id"] for loc in requests.get(f"{API_URL}/api/v1/locations", params={"bbox": bbox}, headers=HEADERS).json()["data"]]
+    assert inside not in ids, "Updated location should leave the bbox"
+    print("✓ Updated location left the bbox")
+
+    response = requests.get(f"{API_URL}/api/v1/locations", params={"bbox": "19,69,18,70"}, headers=HEADERS)
+    assert response.status_code == 400
+    print("✓ Inverted bbox rejected")
+
+    requests.delete(f"{API_URL}/api/v1/observations/{obs_id}", headers=HEADERS)
+    requests.delete(f"{API_URL}/api/v1/locations/{inside}", headers=HEADERS)
+    requests.delete(f"{API_URL}/api/v1/locations/{outside}", headers=HEADERS)
+
+def test_location_clusters():
+    print("\n--- Testing Location Clusters ---")
+
+    response = requests.post(f"{API_URL}/api/v1/locations/batch", json=[
+        {"name": f"Cluster {i}", "latitude": 78.2 + i * 0.001, "longitude": 15.6 + i * 0.001} for i in range(5)
+    ] + [{"name": "Cluster Lone", "latitude": 78.9, "longitude": 11.9}], headers=HEADERS)
+    location_ids = [loc["id"] for loc in response.json()["data"]]
+    obs_id = requests.post(f"{API_URL}/api/v1/observations", json={"species": "Cluster Bird", "date": "2024-07-01", "category": "Fugl", "location_id": location_ids[0]}, headers=HEADERS).json()["id"]
+    params = {"bbox": "10,78,17,79.5", "zoom": 6}
+
+    response = requests.get(f"{API_URL}/api/v1/locations/clusters", params=params, headers=HEADERS)
+    assert response.status_code == 200, f"Clusters failed: {response.status_code}"
+    items = response.json()["data"]
+    cluster = next(item for item in items if item["type"] == "cluster")
+    assert cluster["count"] == 5 and cluster["observation_count"] == 1
+    lone = next(item for item in items if item["type"] == "point")
+    assert lone["location_id"] == location_ids[-1], "A lone location should be returned as a point"
+    print(f"✓ Clustered locations into {len(items)} items")
+
+    # Writes must invalidate cached tiles
+    requests.delete(f"{API_URL}/api/v1/observations/{obs_id}", headers=HEADERS)
+    items = requests.get(f"{API_URL}/api/v1/locations/clusters", params=params, headers=HEADERS).json()["data"]
+    assert next(item for item in items if item["type"] == "cluster")["observation_count"] == 0
+    print("✓ Cluster cache invalidated after write")
+
+    response = requests.get(f"{API_URL}/api/v1/locations/clusters", params={"bbox": "-180,-85,180,85", "zoom": 12}, headers=HEADERS)
+    assert response.status_code == 400
+    print("✓ Too many tiles rejected")
+
+    for location_id in location_ids:
+        requests.delete(f"{API_URL}/api/v1/locations/{location_id}", headers=HEADERS)
+
+def test_vector_tiles():
+    print("\n--- Testing Vector Tiles ---")
+
+    location_id = requests.post(f"{API_URL}/api/v1/locations", json={"name": "Tile Location", "latitude": 59.91, "longitude": 10.75}, headers=HEADERS).json()["id"]
+    url = f"{API_URL}/api/v1/tiles/10/542/297.pbf"
+
+    response = requests.get(url, headers=HEADERS)
+    assert response.status_code == 200, f"Tile failed: {response.status_code}"
+    assert response.headers["content-type"] == "application/vnd.mapbox-vector-tile"
+    assert b"Tile Location" in response.content
+    etag = response.headers["etag"]
+    print(f"✓ Encoded tile of {len(response.content)} bytes")
+
+    response = requests.get(url, headers={**HEADERS, "If-None-Match": etag})
+    assert response.status_code == 304, "Unchanged tile should not be re-sent"
+    print("✓ Unchanged tile returned 304")
+
+    requests.put(f"{API_URL}/api/v1/locations/{location_id}", json={"name": "Tile Renamed"}, headers=HEADERS)
+    response = requests.get(url, headers={**HEADERS, "If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag, "A write should change the ETag"
+    assert b"Tile Renamed" in response.content
+    print("✓ Write changed the tile ETag")
+
+    assert requests.get(f"{API_URL}/api/v1/tiles/2/4/0.pbf", headers=HEADERS).status_code == 404
+    print("✓ Out-of-range tile rejected")
+
+    requests.delete(f"{API_URL}/api/v1/locations/{location_id}", headers=HEADERS)
+
+def test_nearby_locations():
+    print("\n--- Testing Nearby Locations ---")
+
+    response = requests.post(f"{API_URL}/api/v1/locations/batch", json=[
+        {"name": "Nearby Near", "latitude": 60.3913, "longitude": 5.3221},
+        {"name": "Nearby Middle", "latitude": 60.40, "longitude": 5.33},
+        {"name": "Nearby Far", "latitude": 61.0, "longitude": 6.0},
+    ], headers=HEADERS)
+    location_ids = [loc["id"] for loc in response.json()["data"]]
+
+    response = requests.get(f"{API_URL}/api/v1/locations/nearby", params={"lat": 60.3914, "lon": 5.3222, "k": 2}, headers=HEADERS)
+    assert response.status_code == 200, f"Nearby failed: {response.status_code}"
+    nearby = response.json()
+    assert [loc["id"] for loc in nearby] == location_ids[:2], "Nearest locations should come first"
+    assert nearby[0]["distance_m"] < 20
+    print(f"✓ Nearest location is {nearby[0]['distance_m']:.1f} m away")
+
+    response = requests.get(f"{API_URL}/api/v1/locations/nearby", params={"lat": 60.3914, "lon": 5.3222, "k": 10, "radius_m": 5000}, headers=HEADERS)
+    assert location_ids[2] not in [loc["id"] for loc in response.json()], "radius_m should limit the search"
+    print("✓ radius_m limits results")
+
+    for location_id in location_ids:
+        requests.delete(f"{API_URL}/api/v1/locations/{location_id}", headers=HEADERS)
+
+def test_search():
+    print("\n--- Testing Search ---")
+
+    location_id = requests.post(f"{API_URL}/api/v1/locations", json={"name": "Søkelia naturreservat", "latitude": 60.1, "longitude": 10.1, "description": "Våtmark med fuglekasser"}, headers=HEADERS).json()["id"]
+    obs_ids = [
+        requests.post(f"{API_URL}/api/v1/observations", json={"species": "Søkerødstrupe", "date": "2024-05-01", "category": "Fugl", "notes": f"Hekkende par nummer {i}", "location_id": location_id}, headers=HEADERS).json()["id"]
+        for i in range(3)
+    ]
+
+    response = requests.get(f"{API_URL}/api/v1/search", params={"q": "hekker"}, headers=HEADERS)
+    assert response.status_code == 200, f"Search failed: {response.status_code}"
+    hits = response.json()["data"]
+    assert {hit["id"] for hit in hits if hit["type"] == "observation"} == set(obs_ids), "Stemmed notes should match"
+    assert "<b>" in hits[0]["snippet"], "Snippet should highlight the match"
+    print(f"✓ Full-text search found {len(hits)} hits")
+
+    response = requests.get(f"{API_URL}/api/v1/search", params={"q": "Søkerødstrup"}, headers=HEADERS)
+    assert any(hit["type"] == "observation" for hit in response.json()["data"]), "Typo should still match species"
+    response = requests.get(f"{API_URL}/api/v1/search", params={"q": "Søkelia naturresevat"}, headers=HEADERS)
+    assert [hit["id"] for hit in response.json()["data"] if hit["type"] == "location"] == [location_id]
+    print("✓ Fuzzy search matched misspelled species and location")
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"q": "hekkende", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = requests.get(f"{API_URL}/api/v1/search", params=params, headers=HEADERS).json()
+        seen.extend(hit["id"] for hit in page["data"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert sorted(seen) == sorted(obs_ids), "Paging should visit every hit exactly once"
+    print("✓ Search results paged with cursor")
+
+    for obs_id in obs_ids:
+        requests.delete(f"{API_URL}/api/v1/observations/{obs_id}", headers=HEADERS)
+    requests.delete(f"{API_URL}/api/v1/locations/{location_id}", headers=HEADERS)
+
+def test_species_suggest():
+    print("\n--- Testing Species Suggest ---")
+
+    obs_ids = [
+        requests.post(f"{API_URL}/api/v1/observations", json={"species": species, "date": "2024-05-01", "category": "Fugl"}, headers=HEADERS).json()["id"]
+        for species in ["Forslagmeis", "Forslagmeis", "Forslagtrost"]
+    ]
+
+    response = requests.get(f"{API_URL}/api/v1/species/suggest", params={"prefix": "forslag"}, headers=HEADERS)
+    assert response.status_code == 200, f"Suggest failed: {response.status_code}"
+    assert response.json() == [{"species": "Forslagmeis", "count": 2}, {"species": "Forslagtrost", "count": 1}]
+    print("✓ Suggestions ranked by usage")
+
+    # Writes keep the in-memory index current
+    requests.put(f"{API_URL}/api/v1/observations/{obs_ids[2]}", json={"species": "Forslagspurv"}, headers=HEADERS)
+    suggestions = [s["species"] for s in requests.get(f"{API_URL}/api/v1/species/suggest", params={"prefix": "forslag"}, headers=HEADERS).json()]
+    assert "Forslagspurv" in suggestions and "Forslagtrost" not in suggestions
+    for obs_id in obs_ids:
+        requests.delete(f"{API_URL}/api/v1/observations/{obs_id}", headers=HEADERS)
+    assert requests.get(f"{API_URL}/api/v1/species/suggest", params={"prefix": "forslag"}, headers=HEADERS).json() == []
+    print("✓ Suggestions follow updates and deletes")
+
+def test_stats():
+    print("\n--- Testing Stats ---")
+
+    obs_ids = [
+        requests.post(f"{API_URL}/api/v1/observations", json={"species": species, "date": date, "category": category}, headers=HEADERS).json()["id"]
+        for species, date, category in [
+            ("Statistikkmeis", "2011-03-10T12:00:00Z", "Fugl"),
+            ("Statistikkmeis", "2011-03-11T12:00:00Z", "Fugl"),
+            ("Statistikkrev", "2011-06-01T12:00:00Z", "Pattedyr"),
+        ]
+    ]
+    response = requests.post(f"{API_URL}/api/v1/observations/batch", json=[{"species": "Statistikkrev", "date": "2011-06-02T12:00:00Z", "category": "Pattedyr"}], headers=HEADERS)
+    obs_ids += [obs["id"] for obs in response.json()["data"]]
+
+    response = requests.get(f"{API_URL}/api/v1/stats", params={"year": 2011}, headers=HEADERS)
+    assert response.status_code == 200, f"Stats failed: {response.status_code}"
+    stats = response.json()
+    assert stats["total"] == 4
+    assert stats["per_month"] == [{"month": "2011-03", "count": 2}, {"month": "2011-06", "count": 2}]
+    assert stats["top_species"] == [{"species": "Statistikkmeis", "count": 2}, {"species": "Statistikkrev", "count": 2}]
+    assert stats["per_category"] == [{"category": "Fugl", "count": 2}, {"category": "Pattedyr", "count": 2}]
+    print("✓ Stats aggregated per month, species and category")
+
+    # Late on New Year's Eve UTC is already the next year in the stats timezone
+    requests.put(f"{API_URL}/api/v1/observations/{obs_ids[0]}", json={"date": "2011-12-31T23:30:00Z"}, headers=HEADERS)
+    requests.delete(f"{API_URL}/api/v1/observations/{obs_ids[3]}", headers=HEADERS)
+    stats = requests.get(f"{API_URL}/api/v1/stats", params={"year": 2011, "top": 1}, headers=HEADERS).json()
+    assert stats["total"] == 2
+    assert stats["per_month"] == [{"month": "2011-03", "count": 1}, {"month": "2011-06", "count": 1}]
+    assert len(stats["top_species"]) == 1
+    stats = requests.get(f"{API_URL}/api/v1/stats", params={"year": 2012}, headers=HEADERS).json()
+    assert {"month": "2012-01", "count": 1} in stats["per_month"]
+    print("✓ Stats follow updates and deletes")
+
+    # Concurrent writes to one observation must adjust the rollups once each
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        dates = ["2011-07-01T12:00:00Z", "2011-08-01T12:00:00Z", "2011-09-01T12:00:00Z", "2011-10-01T12:00:00Z"]
+        list(pool.map(lambda date: requests.put(f"{API_URL}/api/v1/observations/{obs_ids[2]}", json={"date": date}, headers=HEADERS), dates))
+        statuses = list(pool.map(lambda _: requests.delete(f"{API_URL}/api/v1/observations/{obs_ids[1]}", headers=HEADERS).status_code, range(4)))
+    assert sorted(statuses) == [204, 404, 404, 404], f"Exactly one delete should succeed: {statuses}"
+    stats = requests.get(f"{API_URL}/api/v1/stats", params={"year": 2011}, headers=HEADERS).json()
+    assert stats["total"] == 1
+    assert len(stats["per_month"]) == 1 and stats["per_month"][0]["month"] in {"2011-07", "2011-08", "2011-09", "2011-10"}
+    print("✓ Stats stay consistent under concurrent updates and deletes")
+
+    for obs_id in obs_ids[:3]:
+        requests.delete(f"{API_URL}/api/v1/observations/{obs_id}", headers=HEADERS)
+
+def test_observation_filters():
+    print("\n--- Testing Observation Filters ---")
+
+    location_id = requests.post(f"{API_URL}/api/v1/locations", json={"name": "Filtermyra", "latitude": 60.2, "longitude": 10.2}, headers=HEADERS).json()["id"]
+    obs_ids = [
+        requests.post(f"{API_URL}/api/v1/observations", json={"species": species, "date": date, "category": category, "location_id": location}, headers=HEADERS).json()["id"]
+        for species, date, category, location in [
+            ("Filterspove", "2012-04-01T08:00:00Z", "Filterfugl", location_id),
+            ("Filterspove", "2012-05-01T08:00:00Z", "Filterfugl", None),
+            ("Filterfrosk", "2012-05-02T08:00:00Z", "Filteramfibie", location_id),
+            ("Filterspove", "2012-06-01T08:00:00Z", "Filterfugl", location_id),
+        ]
+    ]
+
+    def ids(**params):
+        response = requests.get(f"{API_URL}/api/v1/observations", params={"count": "exact", **params}, headers=HEADERS)
+        assert response.status_code == 200, f"Filtered list failed: {response.status_code} - {response.text}"
+        data = response.json()
+        assert data["total"] == len(data["data"]), "Filtered total should count only matching rows"
+        return [obs["id"] for obs in data["data"]]
+
+    assert ids(category="Filterfugl", sort_by="date", sort_order="asc") == [obs_ids[0], obs_ids[1], obs_ids[3]]
+    assert ids(species="Filterfrosk") == [obs_ids[2]]
+    assert ids(location_id=location_id, category="Filterfugl") == [obs_ids[3], obs_ids[0]]
+    assert ids(date_from="2012-05-01", date_to="2012-05-31", sort_by="date") == [obs_ids[2], obs_ids[1]]
+    assert ids(species="Filterukjent") == []
+    print("✓ Filtered by category, species, location and date range")
+
+    updated = requests.put(f"{API_URL}/api/v1/observations/{obs_ids[1]}", json={"notes": "Oppdatert"}, headers=HEADERS).json()
+    assert ids(updated_since=updated["updated_at"]) == [obs_ids[1]]
+    print("✓ Filtered by updated_since")
+
+    page = requests.get(f"{API_URL}/api/v1/observations", params={"category": "Filterfugl", "sort_by": "species", "limit": 2}, headers=HEADERS).json()
+    rest = requests.get(f"{API_URL}/api/v1/observations", params={"category": "Filterfugl", "sort_by": "species", "limit": 2, "cursor": page["next_cursor"]}, headers=HEADERS).json()
+    assert sorted(obs["id"] for obs in page["data"] + rest["data"]) == sorted([obs_ids[0], obs_ids[1], obs_ids[3]])
+    assert rest["next_cursor"] is None
+    print("✓ Filters combine with sorting and cursor pagination")
+
+    for obs_id in obs_ids:
+        requests.delete(f"{API_URL}/api/v1/observations/{obs_id}", headers=HEADERS)
+    requests.delete(f"{API_URL}/api/v1/locations/{location_id}", headers=HEADERS)
+
+def test_conditional_get():
+    print("\n--- Testing Conditional GET ---")
+
+    location_id = requests.post(f"{API_URL}/api/v1/locations", json={"name": "Etagvika", "latitude": 60.3, "longitude": 10.3}, headers=HEADERS).json()["id"]
+    for path in ["observations", "locations", f"locations/{location_id}"]:
+        response = requests.get(f"{API_URL}/api/v1/{path}", headers=HEADERS)
+        etag = response.headers["etag"]
+        assert response.status_code == 200 and etag.startswith('"'), "List and detail responses should carry a strong ETag"
+        response = requests.get(f"{API_URL}/api/v1/{path}", headers={**HEADERS, "If-None-Match": etag})
+        assert response.status_code == 304 and response.content == b"", f"Unchanged /{path} should not be re-sent"
+        assert response.headers["etag"] == etag
+    print("✓ Unchanged list and detail returned 304")
+
+    obs_id = requests.post(f"{API_URL}/api/v1/observations", json={"species": "Etagand", "date": "2024-05-01", "category": "Fugl", "location_id": location_id}, headers=HEADERS).json()["id"]
+    response = requests.get(f"{API_URL}/api/v1/locations/{location_id}", headers={**HEADERS, "If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag, "A write should change the ETag"
+    assert response.json()["observation_count"] == 1
+    etag = response.headers["etag"]
+    requests.put(f"{API_URL}/api/v1/observations/{obs_id}", json={"notes": "Endret"}, headers=HEADERS)
+    response = requests.get(f"{API_URL}/api/v1/observations/{obs_id}", headers={**HEADERS, "If-None-Match": etag})
+    assert response.status_code == 200 and response.json()["notes"] == "Endret", "An update should change the ETag"
+    print("✓ Writes changed the ETag")
+
+    requests.delete(f"{API_URL}/api/v1/observations/{obs_id}", headers=HEADERS)
+    requests.delete(f"{API_URL}/api/v1/locations/{location_id}", headers=HEADERS)
+
+def test_response_cache():
+    print("\n--- Testing Response Cache ---")
+
+    def hits():
+        return requests.get(f"{API_URL}/health/caches").json()["responses"]["hits"]
+
+    location_id = requests.post(f"{API_URL}/api/v1/locations", json={"name": "Bufferbukta", "latitude": 60.4, "longitude": 10.4}, headers=HEADERS).json()["id"]
+    first = requests.get(f"{API_URL}/api/v1/locations", params={"sort_by": "name", "limit": 5}, headers=HEADERS)
+    before = hits()
+    second = requests.get(f"{API_URL}/api/v1/locations", params={"limit": 5, "sort_by": "name"}, headers=HEADERS)
+    assert hits() == before + 1, "Repeated page should be served from the cache"
+    assert second.content == first.content and second.headers["etag"] == first.headers["etag"]
+    assert second.headers["content-type"] == "application/json"
+    print("✓ Repeated page served from cache")
+
+    requests.put(f"{API_URL}/api/v1/locations/{location_id}", json={"name": "Bufferbukta sør"}, headers=HEADERS)
+    response = requests.get(f"{API_URL}/api/v1/locations/{location_id}", headers=HEADERS)
+    assert response.json()["name"] == "Bufferbukta sør", "A write should bypass cached responses"
+    requests.delete(f"{API_URL}/api/v1/locations/{location_id}", headers=HEADERS)
+    assert requests.get(f"{API_URL}/api/v1/locations/{location_id}", headers=HEADERS).status_code == 404
+    print("✓ Writes bypassed cached responses")
+
 def run_tests():
     print("=" * 50)
     print("Starting API Tests (via Nginx)")
@@ -397,6 +883,51 @@ def run_tests():
         test_observation_sorting()
         test_location_sorting()
 
+        # Test cursor pagination
+        test_cursor_pagination()
+
+        # Test count modes
+        test_count_modes()
+
+        # Test batch create
+        test_batch_create()
+
+        # Test bulk import
+        test_bulk_import()
+
+        # Test export
+        test_export_observations()
+
+        # Test bbox filter
+        test_bbox_filter()
+
+        # Test location clusters
+        test_location_clusters()
+
+        # Test vector tiles
+        test_vector_tiles()
+
+        # Test nearby locations
+        test_nearby_locations()
+
+        # Test search
+        test_search()
+
+        # Test species suggest
+        test_species_suggest()
+
+        # Test stats
+        test_stats()
+
+        # Test observation filters
+        test_observation_filters()
+
+        # Test conditional GET
+        test_conditional_get()
+
+        # Test response cache
+        test_response_cache()
+
         print("\n" + "=" * 50)
         print("✓ All tests passed!")
         print("=" * 50)